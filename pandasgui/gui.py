@@ -10,7 +10,7 @@ from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtCore import Qt
 
 import pandasgui
-from pandasgui.store import PandasGuiStore
+from pandasgui.store import PandasGuiStore, PandasGuiDataFrameStore
 from pandasgui.utility import as_dict, fix_ipython, get_figure_type, resize_widget
 from pandasgui.widgets.find_toolbar import FindToolbar
 from pandasgui.widgets.json_viewer import JsonViewer
@@ -177,7 +177,13 @@ class PandasGui(QtWidgets.QMainWindow):
             func: Callable
             shortcut: str = ''
 
-        items = {'Edit': [MenuItem(name='Find',
+        items = {'Edit': [MenuItem(name='Undo',
+                                   func=self.undo,
+                                   shortcut='Ctrl+Z'),
+                          MenuItem(name='Redo',
+                                   func=self.redo,
+                                   shortcut='Ctrl+Y'),
+                          MenuItem(name='Find',
                                    func=self.find_bar.show_find_bar,
                                    shortcut='Ctrl+F'),
                           MenuItem(name='Copy',
@@ -272,6 +278,12 @@ class PandasGui(QtWidgets.QMainWindow):
         if self.store.selected_pgdf.dataframe_explorer.active_tab == "DataFrame":
             self.store.selected_pgdf.dataframe_explorer.dataframe_viewer.paste()
 
+    def undo(self):
+        self.store.selected_pgdf.undo()
+
+    def redo(self):
+        self.store.selected_pgdf.redo()
+
     def show_code_export(self):
         self.store.selected_pgdf.dataframe_explorer.code_history_viewer.show()
 
@@ -330,7 +342,7 @@ class PandasGui(QtWidgets.QMainWindow):
 
     def import_dialog(self):
         dialog = QtWidgets.QFileDialog()
-        paths, _ = dialog.getOpenFileNames(filter="*.csv *.xlsx *.parquet *.json")
+        paths, _ = dialog.getOpenFileNames(filter="*.csv *.xlsx *.parquet *.arrow *.feather *.json")
         for path in paths:
             self.store.import_file(path)
 
@@ -415,6 +427,10 @@ class PandasGui(QtWidgets.QMainWindow):
 
     def closeEvent(self, e: QtGui.QCloseEvent) -> None:
         refs.remove(self)
+        # Stop reading files and evaluating filters in the background
+        for pgdf in self.store.data.values():
+            if isinstance(pgdf, PandasGuiDataFrameStore):
+                pgdf.stop_threads()
         super().closeEvent(e)
 
     # Replace all GUI DataFrames with the current DataFrame of the same name from the scope show was called
@@ -457,12 +457,12 @@ def generate_title(pgdf: PandasGuiDataFrameStore, chart_type, kwargs):
         name = pgdf.name
         pgdf_filters = pgdf.filters
         df_unfiltered = pgdf.df_unfiltered
-        df = pgdf.df
+        subset = len(pgdf.filtered_index_map)
     except AttributeError:  # plain dataframe
         name = kwargs.pop("name", "untitled")
         pgdf_filters = pgdf.filters
         df_unfiltered = pgdf.df_unfiltered
-        df = pgdf.df
+        subset = len(pgdf.filtered_index_map)
 
     today = datetime.datetime.now()
     x, y, z, dimensions, columns = axis_title_labels(kwargs)
@@ -542,7 +542,6 @@ def generate_title(pgdf: PandasGuiDataFrameStore, chart_type, kwargs):
         filters = "Filters: " + filters
     total = df_unfiltered.shape[0]
 
-    subset = df.shape[0]
     selection = ""
     groupings = ""
     sep = ""
@@ -9,16 +9,19 @@ if typing.TYPE_CHECKING:
     from pandasgui.widgets.dataframe_explorer import DataFrameExplorer
     from pandasgui.widgets.navigator import Navigator
 
-from dataclasses import dataclass, field
-from typing import Iterable, List, Union
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, Iterable, List, Set, Tuple, Union
 from typing_extensions import Literal
+import numpy as np
 import pandas as pd
 from pandas import DataFrame
 from PyQt5 import QtCore, QtWidgets
 import traceback
 from datetime import datetime
 from pandasgui.utility import unique_name, in_interactive_console, refactor_variable, clean_dataframe, nunique, \
-    parse_cell, parse_all_dates, parse_date, get_movements
+    get_cell_parser, coerce_to_dtype, keeps_dtype, parse_all_dates, parse_date, get_movements, reverse_sort_order, \
+    get_sort_key, reverse_sort_key, is_arrow_dtype, to_numpy_backed, parse_query_expr, is_shown, approximate_nunique, \
+    sample_min_max
 from pandasgui.constants import LOCAL_DATA_DIR
 import os
 from enum import Enum
@@ -26,6 +29,9 @@ import json
 import inspect
 import logging
 import contextlib
+import concurrent.futures
+import pickle
+import tempfile
 
 logger = logging.getLogger(__name__)
 
@@ -88,6 +94,10 @@ DEFAULT_SETTINGS = {'editable': True,
                     'theme': 'light',
                     'auto_finish': True,
                     'refresh_statistics': True,
+                    'progressive_rows': 0,
+                    'approximate_statistics_rows': 10_000_000,
+                    'undo_memory_mb': 512,
+                    'memory_map_files': False,
                     'render_mode': 'auto',
                     'aggregation': 'mean',
                     'title_format': "{name}: {title_columns}{title_dimensions}{names}{title_y}{title_z}{over_by}"
@@ -103,6 +113,10 @@ class SettingsStore(DictLike, QtCore.QObject):
     block: Setting
     editable: Setting
     theme: Setting
+    progressive_rows: Setting
+    approximate_statistics_rows: Setting
+    undo_memory_mb: Setting
+    memory_map_files: Setting
     auto_finish: Setting
     render_mode: Setting
     aggregation: Setting
@@ -152,6 +166,38 @@ class SettingsStore(DictLike, QtCore.QObject):
                                           dtype=bool,
                                           persist=True)
 
+        self.progressive_rows = Setting(label="progressive_rows",
+                                        value=settings['progressive_rows'],
+                                        description="Number of rows to show at first and add each time the table is "
+                                                    "scrolled to the bottom, and to load before showing CSV files. "
+                                                    "0 shows and loads all rows at once",
+                                        dtype=int,
+                                        persist=True)
+
+        self.approximate_statistics_rows = Setting(label="approximate_statistics_rows",
+                                                   value=settings['approximate_statistics_rows'],
+                                                   description="Number of rows from which column statistics are "
+                                                               "estimated, using HyperLogLog for unique counts and a "
+                                                               "sample for the min and max of object columns. 0 always "
+                                                               "computes exact statistics",
+                                                   dtype=int,
+                                                   persist=True)
+
+        self.undo_memory_mb = Setting(label="undo_memory_mb",
+                                      value=settings['undo_memory_mb'],
+                                      description="Memory in MB the undo history of each DataFrame may use. The "
+                                                  "oldest steps beyond it are moved to a temporary directory",
+                                      dtype=int,
+                                      persist=True)
+
+        self.memory_map_files = Setting(label="memory_map_files",
+                                        value=settings['memory_map_files'],
+                                        description="Open Parquet files through a memory mapped Arrow file instead of "
+                                                    "reading them into memory, so files larger than RAM can be browsed. "
+                                                    "Arrow and Feather files are always memory mapped",
+                                        dtype=bool,
+                                        persist=True)
+
         # Settings related to Grapher
 
         self.auto_finish = Setting(label="auto_finish",
@@ -206,6 +252,67 @@ class Filter:
     expr: str
     enabled: bool
     failed: bool
+    # Rows of df_unfiltered that pass the filter, cached until the expression or data changes. See apply_filters
+    mask: Union[np.ndarray, None] = field(default=None, repr=False, compare=False)
+    mask_key: Union[tuple, None] = field(default=None, repr=False, compare=False)
+
+
+@dataclass
+class DataChange:
+    """
+    Describes a modification made to a PandasGuiDataFrameStore, so views can update incrementally instead of resetting.
+    Views work out which rows were added, removed or reordered themselves by comparing PandasGuiDataFrameStore.row_ids
+
+    Attributes:
+        kind        'reset' if anything may have changed, 'cells' for values changed in place, 'filter' when rows were
+                    filtered in or out, 'sort' when rows were reordered, 'column_removed' or 'columns_moved'
+        rows        Positions in df_unfiltered of the changed rows, for 'cells'. None means all rows
+        columns     Positions of the changed columns for 'cells', or the removed column for 'column_removed'.
+                    None means all columns
+        movements   List of (src, dest) column moves for 'columns_moved', applied in order
+        kinds       Kinds of all the changes combined into this one by merge
+    """
+    kind: Literal['reset', 'cells', 'filter', 'sort', 'column_removed', 'columns_moved']
+    rows: Union[List[int], None] = None
+    columns: Union[List[int], None] = None
+    movements: List[Tuple[int, int]] = field(default_factory=list)
+    kinds: Set[str] = field(default_factory=set)
+
+    def __post_init__(self):
+        self.kinds = self.kinds | {self.kind}
+
+    def merge(self, later: DataChange) -> DataChange:
+        """
+        Combine this change with one made after it into a single change with the same effect on views
+        """
+        kinds = self.kinds | later.kinds
+        row_kinds = {'filter', 'sort'}
+        if 'reset' in kinds:
+            return DataChange('reset')
+
+        if self.kind == later.kind == 'column_removed':
+            # Removals are applied in order so positions of later ones are already relative to the earlier ones
+            return DataChange('column_removed', columns=self.columns + later.columns, kinds=kinds)
+        if self.kind == later.kind == 'columns_moved':
+            return DataChange('columns_moved', movements=self.movements + later.movements, kinds=kinds)
+        if {self.kind, later.kind} <= row_kinds:
+            return DataChange('sort' if 'sort' in kinds else 'filter', kinds=kinds)
+
+        if {self.kind, later.kind} <= row_kinds | {'cells'}:
+            cells = [change for change in [self, later] if change.kind == 'cells']
+            # Sorting doesn't move rows in df_unfiltered, so the positions of changed rows are still valid after one
+            if any(change.rows is None for change in cells):
+                rows = None
+            else:
+                rows = sorted(set().union(*[change.rows for change in cells]))
+            if any(change.columns is None for change in cells):
+                columns = None
+            else:
+                columns = sorted(set().union(*[change.columns for change in cells]))
+            return DataChange('cells', rows=rows, columns=columns, kinds=kinds)
+
+        # Positions in changes made before columns were removed or moved are stale
+        return DataChange('reset')
 
 
 @dataclass
@@ -220,6 +327,203 @@ class HistoryItem:
         self.time = datetime.now().strftime("%H:%M:%S")
 
 
+@dataclass
+class CellsDelta:
+    # Values at positions of column ix before and after they were written in place
+    ix: int
+    positions: np.ndarray
+    old: pd.Series
+    new: pd.Series
+
+
+@dataclass
+class ColumnDelta:
+    # Column ix before and after it was replaced. old is None for an inserted column and new for a removed one
+    ix: int
+    name: typing.Any
+    old: Union[pd.Series, None]
+    new: Union[pd.Series, None]
+
+
+@dataclass
+class OrderDelta:
+    # Columns were reordered so position i holds the column that was at order[i]
+    order: np.ndarray
+
+
+@dataclass
+class UndoStep:
+    """
+    The changes made by one modification of a PandasGuiDataFrameStore, see PandasGuiDataFrameStore.undo. Only what
+    changed is kept, so undoing and redoing take time in proportion to the change and not the DataFrame
+
+    Attributes:
+        deltas          CellsDelta, ColumnDelta and OrderDelta in the order they were applied. None while spilled
+        path            File the deltas were spilled to by UndoLog, or None while they're in memory
+        sort_before     (sorted_column_name, sorted_index_level, sort_state, secondary_sort_columns) before the change
+        sort_after      The same after the change
+        history         HistoryItems added by the change, removed from the code export while it's undone
+    """
+    description: str
+    deltas: Union[List[Union[CellsDelta, ColumnDelta, OrderDelta]], None] = field(default_factory=list)
+    path: Union[str, None] = None
+    nbytes: int = 0
+    sort_before: tuple = ()
+    sort_after: tuple = ()
+    history: List[HistoryItem] = field(default_factory=list)
+
+
+class UndoLog:
+    def __init__(self, pgdf: PandasGuiDataFrameStore):
+        """
+        Undo and redo stacks of the UndoSteps of pgdf. When the steps in memory take more than the undo_memory_mb
+        setting, the oldest are pickled to a temporary directory and loaded again when they're undone or redone
+        """
+        self.pgdf = pgdf
+        self.undo_steps: List[UndoStep] = []
+        self.redo_steps: List[UndoStep] = []
+        # Created when a step is first spilled, and deleted with this log
+        self.spill_dir: Union[tempfile.TemporaryDirectory, None] = None
+        self.spill_count = 0
+
+    @staticmethod
+    def get_nbytes(step: UndoStep) -> int:
+        # Object columns only count their pointers, measuring the objects would mean visiting each one
+        nbytes = 0
+        for delta in step.deltas:
+            for value in vars(delta).values():
+                if isinstance(value, pd.Series):
+                    nbytes += value.memory_usage(index=True, deep=False)
+                elif isinstance(value, np.ndarray):
+                    nbytes += value.nbytes
+        return nbytes
+
+    def push(self, step: UndoStep):
+        step.nbytes = self.get_nbytes(step)
+        self.undo_steps.append(step)
+        self.redo_steps = []
+        self.spill()
+
+    def pop_undo(self) -> Union[UndoStep, None]:
+        return self.move(self.undo_steps, self.redo_steps)
+
+    def pop_redo(self) -> Union[UndoStep, None]:
+        return self.move(self.redo_steps, self.undo_steps)
+
+    def move(self, source: List[UndoStep], destination: List[UndoStep]) -> Union[UndoStep, None]:
+        # Take the last step from one stack to the other, loading its deltas if they were spilled
+        if not source:
+            return None
+        step = source.pop()
+        if step.path is not None:
+            with open(step.path, 'rb') as f:
+                step.deltas = pickle.load(f)
+            os.remove(step.path)
+            step.path = None
+        destination.append(step)
+        self.spill(keep=step)
+        return step
+
+    def spill(self, keep: UndoStep = None):
+        """
+        Pickle steps to the temporary directory until the ones left in memory fit in the budget. keep is about to be
+        applied so it stays in memory
+        """
+        budget = self.pgdf.settings.undo_memory_mb.value * 1024 ** 2
+        # Steps furthest from being undone or redone go first
+        distances = [(len(steps) - i, step) for steps in [self.undo_steps, self.redo_steps]
+                     for i, step in enumerate(steps) if step.path is None and step is not keep]
+        used = sum(step.nbytes for _, step in distances)
+        for _, step in sorted(distances, key=lambda item: -item[0]):
+            if used <= budget:
+                break
+            if self.spill_dir is None:
+                self.spill_dir = tempfile.TemporaryDirectory(prefix='pandasgui_undo_')
+            self.spill_count += 1
+            step.path = os.path.join(self.spill_dir.name, f"{self.spill_count}.pickle")
+            with open(step.path, 'wb') as f:
+                pickle.dump(step.deltas, f, protocol=pickle.HIGHEST_PROTOCOL)
+            step.deltas = None
+            used -= step.nbytes
+
+    def clear(self):
+        self.undo_steps = []
+        self.redo_steps = []
+        if self.spill_dir is not None:
+            self.spill_dir.cleanup()
+            self.spill_dir = None
+
+
+@dataclass
+class ColumnStatistics:
+    """
+    Statistics of one column of the filtered rows, cached by PandasGuiDataFrameStore.refresh_statistics.
+    Numeric columns keep m2 (the sum of squared differences from the mean) so a changed value can be applied to the
+    count, mean and StdDev with Welford's method (see replace_value) instead of reading the whole column again.
+
+    Attributes:
+        key                 The column and filter versions these are for, see get_column_statistics_key
+        nunique             None when it has to be counted again
+        incremental         Whether replace_value can be used, only for numeric non-bool columns
+        min_max_outdated    Set when a value equal to min or max was replaced, so they have to be found again
+        estimates           Names of the statistics that are estimates, see approximate_statistics_rows
+    """
+    type: str
+    count: int
+    nunique: Union[int, None]
+    mean: float = np.nan
+    m2: float = 0.0
+    min: typing.Any = np.nan
+    max: typing.Any = np.nan
+    incremental: bool = False
+    min_max_outdated: bool = False
+    estimates: Tuple[str, ...] = ()
+    key: Union[tuple, None] = None
+
+    @property
+    def std(self) -> float:
+        # Sample standard deviation like pd.Series.std. Only numeric columns have a mean
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 and not pd.isna(self.mean) else np.nan
+
+    def replace_value(self, old, new):
+        if not pd.isna(old):
+            if old == self.min or old == self.max:
+                self.min_max_outdated = True
+            self.count -= 1
+            if self.count == 0:
+                self.mean, self.m2 = np.nan, 0.0
+            else:
+                mean = (self.mean * (self.count + 1) - float(old)) / self.count
+                self.m2 = max(self.m2 - (float(old) - self.mean) * (float(old) - mean), 0.0)
+                self.mean = mean
+
+        if not pd.isna(new):
+            self.count += 1
+            if self.count == 1:
+                self.mean, self.m2 = float(new), 0.0
+            else:
+                delta = float(new) - self.mean
+                self.mean += delta / self.count
+                self.m2 += delta * (float(new) - self.mean)
+            if not self.min_max_outdated:
+                self.min = new if pd.isna(self.min) or new < self.min else self.min
+                self.max = new if pd.isna(self.max) or new > self.max else self.max
+
+        # Whether the number of unique values changed depends on the other values
+        self.nunique = None
+
+
+# Statistics of a non-numeric column
+def compute_object_statistics(column: pd.Series, approximate=False) -> ColumnStatistics:
+    if not approximate:
+        return ColumnStatistics(type=str(column.dtype), count=column.count(),
+                                nunique=nunique(column.to_frame()).iloc[0])
+    statistics = ColumnStatistics(type=str(column.dtype), count=column.count(), nunique=approximate_nunique(column),
+                                  estimates=('N Unique', 'Min', 'Max'))
+    statistics.min, statistics.max = sample_min_max(column)
+    return statistics
+
+
 # Use this decorator on PandasGuiStore or PandasGuiDataFrameStore to display a status bar message during a method run
 def status_message_decorator(message):
     def decorator(function):
@@ -242,16 +546,19 @@ def status_message_decorator(message):
                 new_message = new_message.replace('{' + arg_name + '}', str(full_kwargs[arg_name]))
 
             if self.gui is not None:
-                original_status = self.gui.statusBar().currentMessage()
-                self.gui.statusBar().showMessage(new_message)
-                self.gui.statusBar().repaint()
-                QtWidgets.QApplication.instance().processEvents()
-                try:
-                    result = function(self, *args, **kwargs)
-                finally:
-                    self.gui.statusBar().showMessage(original_status)
+                # Processing events to show the message would otherwise notify views of each change separately
+                hold = self.change_bus.hold() if isinstance(self, PandasGuiDataFrameStore) else contextlib.nullcontext()
+                with hold:
+                    original_status = self.gui.statusBar().currentMessage()
+                    self.gui.statusBar().showMessage(new_message)
                     self.gui.statusBar().repaint()
                     QtWidgets.QApplication.instance().processEvents()
+                    try:
+                        result = function(self, *args, **kwargs)
+                    finally:
+                        self.gui.statusBar().showMessage(original_status)
+                        self.gui.statusBar().repaint()
+                        QtWidgets.QApplication.instance().processEvents()
             else:
                 result = function(self, *args, **kwargs)
             return result
@@ -276,11 +583,12 @@ class PandasGuiDataFrameStore(PandasGuiStoreItem):
     All methods that modify the data should modify self.df_unfiltered, then self.df gets computed from that
     """
 
-    def __init__(self, df: DataFrame, name: str = 'Untitled'):
+    def __init__(self, df: DataFrame, name: str = 'Untitled', statistics_enabled: bool = True):
         super().__init__()
         df = df.copy()
 
-        self.df: DataFrame = df
+        # The filtered DataFrame, built when self.df is first used after the data or filters change
+        self._df: Union[DataFrame, None] = None
         self.df_unfiltered: DataFrame = df
         self.name = name
 
@@ -295,66 +603,320 @@ class PandasGuiDataFrameStore(PandasGuiStoreItem):
         self.dataframe_viewer: Union[DataFrameViewer, None] = None
         self.stats_viewer: Union[DataFrameViewer, None] = None
         self.filter_viewer: Union[FilterViewer, None] = None
+        # Reads the rest of a file in the background, see PandasGuiStore.import_file
+        self.loader: Union[ChunkLoaderThread, None] = None
+        # Evaluate filters in the background, see apply_filters. Cancelled threads stay here until they finish
+        self.filter_threads: List[FilterThread] = []
+        # Incremented every time filters are applied, so results of filter threads started before are ignored
+        self.filter_generation = 0
 
         self.sorted_column_name: Union[str, None] = None
         self.sorted_index_level: Union[int, None] = None
         self.sort_state: Literal['Asc', 'Desc', 'None'] = 'None'
+        # (name, sort_state) of the columns rows are sorted by after sorted_column_name, added by shift-clicking headers
+        self.secondary_sort_columns: List[Tuple[typing.Any, Literal['Asc', 'Desc']]] = []
+        # Sorting doesn't reorder df_unfiltered. Rows are shown in this order instead, as positions in df_unfiltered,
+        # or in their order in df_unfiltered when it's None. See update_sort_order
+        self.sort_order: Union[np.ndarray, None] = None
+        # Sort orders of recently sorted columns and index levels, see get_sort_order
+        self.sort_orders: Dict[tuple, tuple] = {}
 
         self.filters: List[Filter] = []
-        self.filtered_index_map = df.reset_index().index
-
-        # Statistics
+        # Positions in df_unfiltered of the rows shown, the rows passing filter_mask in the order of sort_order
+        self.filtered_index_map = np.arange(len(df))
+        # Rows of df_unfiltered that pass all the enabled filters, or None when there are none
+        self.filter_mask: Union[np.ndarray, None] = None
+
+        # Identifies each row of df_unfiltered by its original position, so views can follow rows through sorts
+        self.row_ids = np.arange(len(df))
+
+        # Incremented every time the data changes. Caches of derived data (like formatted cell text) are keyed on this
+        self.data_version = 0
+        # Filter masks are keyed on these, so a change only invalidates the filters that use the changed columns.
+        # rows_version is incremented when rows are added or removed, and column_versions has a count for
+        # each column name that is incremented when its values change
+        self.rows_version = 0
+        self.column_versions: Dict[str, int] = {}
+
+        # Statistics. Disabled for stores that show statistics themselves, see StatisticsViewer
+        self.statistics_enabled = statistics_enabled
         self.column_statistics = None
-        self.row_statistics = None
         self.statistics_outdated = True
+        # Row statistics are only needed to color cells by row, so they're computed when used. See row_statistics
+        self._row_statistics: Union[DataFrame, None] = None
+        self._row_statistics_version = None
+        # ColumnStatistics of each column by name, so only columns that changed are read again
+        self.statistics_cache: Dict[str, ColumnStatistics] = {}
+        # Cache keys of columns whose statistics are computed exactly even above approximate_statistics_rows
+        self.exact_statistics = set()
+        # Compute statistics in the background, see refresh_statistics
+        self.statistics_threads: List[StatisticsThread] = []
+        self.statistics_generation = 0
+        # Columns that finish close together update column_statistics once, instead of rebuilding it for each column
+        self.statistics_frame_timer = QtCore.QTimer()
+        self.statistics_frame_timer.setSingleShot(True)
+        self.statistics_frame_timer.setInterval(100)
+        self.statistics_frame_timer.timeout.connect(self.update_statistics_frame)
+
+        # Undo and redo, see undo_step
+        self.undo_log = UndoLog(self)
+
+        # Views subscribe to this to be notified of changes, see data_changed
+        self.change_bus = ChangeBus()
+        self.change_bus.subscribe(self.update_statistics)
+        self.change_bus.subscribe(self.refresh_ui)
 
         self.data_changed()
 
     @property
     def sorted_column_ix(self):
+        return self.get_column_ix(self.sorted_column_name)
+
+    def get_column_ix(self, name) -> Union[int, None]:
+        columns = self.df_unfiltered.columns
+        # Look up through the index's hash table when possible, this is checked whenever the column headers are painted
+        if columns.is_unique:
+            ix = columns.get_indexer([name])[0]
+            return None if ix == -1 else int(ix)
         try:
-            return list(self.df_unfiltered.columns).index(self.sorted_column_name)
+            return list(columns).index(name)
         except ValueError:
             return None
 
-    def __setattr__(self, name, value):
-        if name == 'df':
-            value.pgdf = self
-        super().__setattr__(name, value)
+    def get_column_sort_state(self, ix: int) -> Literal['Asc', 'Desc', 'None']:
+        # The direction rows are sorted by column ix in, as the first or a secondary sort key
+        if self.sort_state == 'None' or self.sorted_column_name is None:
+            return 'None'
+        if ix == self.sorted_column_ix:
+            return self.sort_state
+        for name, state in self.secondary_sort_columns:
+            if ix == self.get_column_ix(name):
+                return state
+        return 'None'
 
     def pg_widget(self):
         return self.dataframe_explorer
 
+    @property
+    def df(self) -> DataFrame:
+        """
+        df_unfiltered sorted and with the filters applied. The GUI reads the filtered rows through filtered_index_map
+        instead (see filtered_iloc), so this is only built for callers that need a DataFrame and kept until the next
+        change. It's always a copy, so changes made to it don't skip the versions and undo steps of the store
+        """
+        if self._df is None:
+            if self.any_rows_rearranged():
+                self._df = self.df_unfiltered.iloc[self.filtered_index_map]
+            else:
+                self._df = self.df_unfiltered.copy()
+            self._df.pgdf = self
+        return self._df
+
+    def any_rows_filtered(self):
+        return len(self.filtered_index_map) != len(self.df_unfiltered)
+
+    # Whether the rows shown aren't all of df_unfiltered in its order
+    def any_rows_rearranged(self):
+        return self.sort_order is not None or self.any_rows_filtered()
+
+    def filtered_iloc(self, rows=slice(None), columns=slice(None)):
+        """
+        Equivalent to self.df.iloc[rows, columns], without building self.df
+        """
+        if self.any_rows_rearranged():
+            return self.df_unfiltered.iloc[self.filtered_index_map[rows], columns]
+        return self.df_unfiltered.iloc[rows, columns]
+
+    # The row_ids of the rows in self.df
+    @property
+    def filtered_row_ids(self):
+        return self.row_ids[self.filtered_index_map]
+
     @status_message_decorator("Refreshing statistics...")
     def refresh_statistics(self, force=False):
+        """
+        Compute statistics of the columns that changed since they were last computed. In the GUI they're computed in a
+        StatisticsThread and column_statistics is filled in as each column finishes
+        """
         if force or self.settings.refresh_statistics.value:
-            df = self.df
-            self.column_statistics = pd.DataFrame({
-                "Type": df.dtypes.astype(str),
-                "Count": df.count(),
-                "N Unique": nunique(df),
-                "Mean": df.mean(numeric_only=True),
-                "StdDev": df.std(numeric_only=True),
-                "Min": df.min(numeric_only=True),
-                "Max": df.max(numeric_only=True),
-            }, index=df.columns
-            )
+            columns = self.df_unfiltered.columns
+            if not columns.is_unique:
+                self.statistics_cache = {}
+
+            rows = len(self.filtered_index_map) if self.any_rows_filtered() else len(self.df_unfiltered)
+            threshold = self.settings.approximate_statistics_rows.value
+            jobs = []
+            cache = {}
+            for ix in range(len(columns)):
+                cache_key = self.get_statistics_cache_key(ix)
+                key = self.get_column_statistics_key(columns[ix])
+                approximate = 0 < threshold <= rows and cache_key not in self.exact_statistics
+                statistics = self.statistics_cache.get(cache_key)
+                if statistics is None or statistics.key != key or (statistics.estimates and not approximate):
+                    jobs.append((ix, key, None, approximate))
+                    continue
+                cache[cache_key] = statistics
+                # Parts that couldn't be updated when values were replaced
+                if statistics.nunique is None or statistics.min_max_outdated:
+                    jobs.append((ix, key, statistics, approximate))
+            self.statistics_cache = cache
+
+            # Results of threads started before are outdated
+            self.statistics_generation += 1
+            for thread in self.statistics_threads:
+                thread.cancel()
+            self.statistics_threads = [thread for thread in self.statistics_threads if not thread.isFinished()]
+
+            self.statistics_outdated = False
+            self.update_statistics_frame()
+            if jobs:
+                thread = StatisticsThread(self, jobs, self.statistics_generation)
+                thread.column_computed.connect(self.on_column_statistics_computed)
+                if self.gui is None:
+                    thread.run()
+                    self.update_statistics_frame()
+                else:
+                    self.statistics_threads.append(thread)
+                    thread.start()
+
+    def on_column_statistics_computed(self, result):
+        generation, ix, statistics = result
+        if generation != self.statistics_generation:
+            return
+        self.statistics_cache[self.get_statistics_cache_key(ix)] = statistics
+        # Not restarted by each column, so the table still fills in while columns keep finishing
+        if self.gui is not None and not self.statistics_frame_timer.isActive():
+            self.statistics_frame_timer.start()
+
+    def compute_exact_statistics(self, ix: int):
+        """
+        Replace the estimated statistics of column ix with exact ones, and keep computing them exactly from now on
+        """
+        self.exact_statistics.add(self.get_statistics_cache_key(ix))
+        self.refresh_statistics(force=True)
+
+    def update_statistics_frame(self):
+        """
+        Build column_statistics from the cached statistics of each column. Columns still being computed are missing
+        """
+        self.statistics_frame_timer.stop()
+        columns = self.df_unfiltered.columns
+        column_statistics = [self.statistics_cache.get(self.get_statistics_cache_key(ix)) for ix in range(len(columns))]
+        types = self.df_unfiltered.dtypes.astype(str)
+
+        def values(attribute):
+            return [np.nan if statistics is None else getattr(statistics, attribute)
+                    for statistics in column_statistics]
+
+        self.column_statistics = pd.DataFrame({
+            "Type": types.values,
+            "Count": values('count'),
+            "N Unique": values('nunique'),
+            "Mean": values('mean'),
+            "StdDev": values('std'),
+            "Min": values('min'),
+            "Max": values('max'),
+        }, index=columns)
+        # Say which values are estimates, only when there are any
+        estimates = [', '.join(statistics.estimates) if statistics is not None else ''
+                     for statistics in column_statistics]
+        if any(estimates):
+            self.column_statistics["Estimated"] = estimates
 
-            df = self.df.transpose()
-            df_numeric = self.df.select_dtypes('number').transpose()
-            self.row_statistics = pd.DataFrame({
-                # "Type": df.dtypes.astype(str),
-                # "Count": df.count(),
-                # "N Unique": nunique(df),
-                # "Mean": df_numeric.mean(numeric_only=True),
-                # "StdDev": df_numeric.std(numeric_only=True),
-                # "Min": df_numeric.min(numeric_only=True),
-                "Max": df_numeric.max(numeric_only=True),
-            }, index=df.columns
-            )
+        if self.dataframe_explorer is not None:
+            self.dataframe_explorer.statistics_viewer.refresh_statistics()
+
+    def get_statistics_cache_key(self, ix: int):
+        # Statistics are cached by column name so they can be found after columns are moved, or by position when the
+        # names aren't unique
+        columns = self.df_unfiltered.columns
+        return columns[ix] if columns.is_unique else ('Position', ix)
+
+    def get_current_column_statistics(self, ix: int) -> Union[ColumnStatistics, None]:
+        # The cached statistics of column ix if they're for the current data and filters
+        statistics = self.statistics_cache.get(self.get_statistics_cache_key(ix))
+        if statistics is None or statistics.key != self.get_column_statistics_key(self.df_unfiltered.columns[ix]):
+            return None
+        return statistics
+
+    def get_column_statistics_key(self, name) -> tuple:
+        """
+        The version of the data statistics of a column depend on, which is the values of the column and which rows are
+        filtered. Statistics don't depend on the order of rows, so sorting doesn't change this
+        """
+        filter_keys = []
+        for filt in self.filters:
+            if filt.enabled and not filt.failed:
+                expr, _, column_versions = self.get_filter_mask_key(filt)
+                filter_keys.append((expr, column_versions))
+        return self.column_versions.get(name, 0), len(self.df_unfiltered), tuple(filter_keys)
+
+    def compute_column_statistics(self, column: pd.Series, approximate=False) -> ColumnStatistics:
+        """
+        Statistics of a column of the filtered rows. Called from the worker threads of StatisticsThread. When
+        approximate, the unique count is estimated
+        """
+        if not pd.api.types.is_numeric_dtype(column):
+            return compute_object_statistics(column, approximate)
+
+        std = column.std()
+        if approximate:
+            statistics = ColumnStatistics(type=str(column.dtype), count=column.count(),
+                                          nunique=approximate_nunique(column), estimates=('N Unique',))
+        else:
+            statistics = ColumnStatistics(type=str(column.dtype), count=column.count(),
+                                          nunique=nunique(column.to_frame()).iloc[0])
+        statistics.mean = column.mean()
+        statistics.m2 = std ** 2 * (statistics.count - 1) if statistics.count > 1 else 0.0
+        statistics.min = column.min()
+        statistics.max = column.max()
+        statistics.incremental = not pd.api.types.is_bool_dtype(column)
+        return statistics
+
+    def update_column_statistics(self, ix: int, key: tuple, old_value, new_value):
+        """
+        Apply a value of the filtered rows in column ix changing from old_value to new_value to its cached statistics.
+        key is the column's get_column_statistics_key from before the change. If the change also changed which rows
+        are filtered, or the cached statistics are outdated anyway, the column is read again on the next refresh
+        """
+        name = self.df_unfiltered.columns[ix]
+        columns_unique = self.df_unfiltered.columns.is_unique
+        statistics = self.statistics_cache.get(name)
+        new_key = self.get_column_statistics_key(name)
+        if (columns_unique and statistics is not None and statistics.incremental and statistics.key == key
+                and new_key[1:] == key[1:]
+                and statistics.type == str(self.df_unfiltered.dtypes.iloc[ix])):
+            statistics.replace_value(old_value, new_value)
+            statistics.key = new_key
 
-            if self.dataframe_explorer is not None:
-                self.dataframe_explorer.statistics_viewer.refresh_statistics()
+    @property
+    def row_statistics(self) -> DataFrame:
+        """
+        Statistics of each filtered row, computed when first used after the data changes
+        """
+        if self._row_statistics is None or self._row_statistics_version != self.data_version:
+            index = self.df_unfiltered.index
+            self._row_statistics = pd.DataFrame({
+                "Max": self.compute_row_max(),
+            }, index=index[self.filtered_index_map] if self.any_rows_rearranged() else index
+            )
+            self._row_statistics_version = self.data_version
+        return self._row_statistics
+
+    # Rows of the numeric block converted to float at a time in compute_row_max
+    row_chunk_size = 1_000_000
+
+    def compute_row_max(self) -> np.ndarray:
+        numeric = [ix for ix, dtype in enumerate(self.df_unfiltered.dtypes)
+                   if pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)]
+        row_max = np.full(len(self.filtered_index_map), np.nan)
+        if numeric:
+            # fmax ignores missing values like nanmax, without warning about rows where all values are missing
+            for start in range(0, len(row_max), self.row_chunk_size):
+                rows = slice(start, start + self.row_chunk_size)
+                block = self.filtered_iloc(rows, numeric).to_numpy(dtype='float64', na_value=np.nan)
+                row_max[rows] = np.fmax.reduce(block, axis=1)
+        return row_max
 
     ###################################
     # Code history
@@ -362,7 +924,7 @@ class PandasGuiDataFrameStore(PandasGuiStoreItem):
     @status_message_decorator("Generating code export...")
     def code_export(self):
 
-        if len(self.history) == 0 and not any([filt.enabled for filt in self.filters]):
+        if len(self.history) == 0 and self.sort_state == 'None' and not any([filt.enabled for filt in self.filters]):
             return f"# No actions have been recorded yet on this DataFrame ({self.name})"
 
         code_history = "# 'df' refers to the DataFrame passed into 'pandasgui.show'\n\n"
@@ -375,11 +937,31 @@ class PandasGuiDataFrameStore(PandasGuiStoreItem):
             code_history += history_item.code
             code_history += "\n\n"
 
-        if any([filt.enabled for filt in self.filters]):
+        # Sorting only changes the order rows are shown in, so the current sort is applied after all the edits
+        ascending = self.sort_state == 'Asc'
+        if self.sort_state != 'None' and self.secondary_sort_columns:
+            keys = [(self.sorted_column_name, self.sort_state)] + self.secondary_sort_columns
+            names = [name for name, _ in keys]
+            ascending = [state == 'Asc' for _, state in keys]
+            code_history += f"# Sort\n"
+            code_history += f"df = df.sort_values({names}, ascending={ascending}, kind='mergesort')\n\n"
+        elif self.sort_state != 'None' and self.sorted_column_name is not None:
+            code_history += f"# Sort\n"
+            code_history += (f"df = df.sort_values('{self.sorted_column_name}', ascending={ascending}, "
+                             f"kind='mergesort')\n\n")
+        elif self.sort_state != 'None':
+            level = f"level={self.sorted_index_level}, " if isinstance(self.df_unfiltered.index, pd.MultiIndex) else ""
+            code_history += f"# Sort\n"
+            code_history += f"df = df.sort_index({level}ascending={ascending}, kind='mergesort')\n\n"
+
+        # Each filter is evaluated on the whole frame and the results combined, so they're exported as a single query
+        exprs = [filt.expr for filt in self.filters if filt.enabled]
+        if len(exprs) == 1:
             code_history += f"# Filters\n"
-        for filt in self.filters:
-            if filt.enabled:
-                code_history += f"df = df.query('{filt.expr}')\n"
+            code_history += f"df = df.query('{exprs[0]}')\n"
+        elif exprs:
+            code_history += f"# Filters\n"
+            code_history += f"df = df.query('{' and '.join(f'({expr})' for expr in exprs)}')\n"
 
         return code_history
 
@@ -389,50 +971,171 @@ class PandasGuiDataFrameStore(PandasGuiStoreItem):
         if self.gui is not None:
             self.gui.update_code_export()
 
+    ###################################
+    # Undo
+
+    @contextlib.contextmanager
+    def undo_step(self, description: str):
+        """
+        Record a modification so it can be undone. The yielded UndoStep gets the deltas of each change made through
+        write_cells, replace_column and _reorder_columns, any history items added and the sort before and after
+        """
+        step = UndoStep(description, sort_before=self.get_sort())
+        history_length = len(self.history)
+        yield step
+        step.sort_after = self.get_sort()
+        step.history = self.history[history_length:]
+        if step.deltas or step.sort_before != step.sort_after:
+            self.undo_log.push(step)
+
+    def get_sort(self) -> tuple:
+        return self.sorted_column_name, self.sorted_index_level, self.sort_state, tuple(self.secondary_sort_columns)
+
+    def write_cells(self, step: UndoStep, ix: int, positions: np.ndarray, values: pd.Series):
+        """
+        Write values to the rows at positions of column ix. If that would change the column's dtype, the whole column
+        is kept for undo, otherwise only the values it replaced
+        """
+        dtype = self.df_unfiltered.dtypes.iloc[ix]
+        if not keeps_dtype(values, dtype):
+            column = self.df_unfiltered.iloc[:, ix].copy()
+            column.iloc[positions] = values.array
+            self.replace_column(step, ix, column)
+            return
+
+        old = self.df_unfiltered.iloc[positions, ix].reset_index(drop=True)
+        self.df_unfiltered.iloc[positions, ix] = values.array
+        new = self.df_unfiltered.iloc[positions, ix].reset_index(drop=True)
+        step.deltas.append(CellsDelta(ix, positions, old, new))
+
+    def replace_column(self, step: UndoStep, ix: int, column: pd.Series):
+        # Both versions are copied, the new one may be edited in place later
+        old = self.df_unfiltered.iloc[:, ix].reset_index(drop=True).copy()
+        self.df_unfiltered.isetitem(ix, column.array)
+        new = self.df_unfiltered.iloc[:, ix].reset_index(drop=True).copy()
+        step.deltas.append(ColumnDelta(ix, self.df_unfiltered.columns[ix], old, new))
+
+    @status_message_decorator("Undoing...")
+    def undo(self):
+        step = self.undo_log.pop_undo()
+        if step is not None:
+            self.apply_undo_step(step, undo=True)
+
+    @status_message_decorator("Redoing...")
+    def redo(self):
+        step = self.undo_log.pop_redo()
+        if step is not None:
+            self.apply_undo_step(step, undo=False)
+
+    def apply_undo_step(self, step: UndoStep, undo: bool):
+        """
+        Reverse the deltas of step, or apply them again to redo it
+        """
+        for delta in reversed(step.deltas) if undo else step.deltas:
+            if isinstance(delta, CellsDelta):
+                values = delta.old if undo else delta.new
+                self.df_unfiltered.iloc[delta.positions, delta.ix] = values.array
+                change = DataChange('cells', rows=list(delta.positions), columns=[delta.ix])
+            elif isinstance(delta, ColumnDelta):
+                column, replaced = (delta.old, delta.new) if undo else (delta.new, delta.old)
+                if column is None:
+                    keep = [ix for ix in range(len(self.df_unfiltered.columns)) if ix != delta.ix]
+                    self.df_unfiltered = self.df_unfiltered.iloc[:, keep]
+                    change = DataChange('column_removed', columns=[delta.ix])
+                elif replaced is None:
+                    self.df_unfiltered.insert(delta.ix, delta.name, column.array, allow_duplicates=True)
+                    change = DataChange('reset')
+                else:
+                    self.df_unfiltered.isetitem(delta.ix, column.array)
+                    change = DataChange('cells', columns=[delta.ix])
+            else:
+                order = delta.order
+                if undo:
+                    order = np.empty_like(delta.order)
+                    order[delta.order] = np.arange(len(delta.order))
+                self._reorder_columns(order)
+                change = DataChange('columns_moved', movements=get_movements(list(range(len(order))), list(order)))
+            self.apply_filters(change)
+
+        if step.sort_before != step.sort_after:
+            self.sorted_column_name, self.sorted_index_level, self.sort_state, secondary_sort_columns = \
+                step.sort_before if undo else step.sort_after
+            self.secondary_sort_columns = list(secondary_sort_columns)
+            self.update_sort_order()
+            self.apply_filters(DataChange('sort'))
+        if undo:
+            self.history = [item for item in self.history if not any(item is other for other in step.history)]
+        else:
+            self.history += step.history
+        if self.gui is not None:
+            self.gui.update_code_export()
+
     ###################################
     # Editing cell data
 
     @status_message_decorator("Applying cell edit...")
     def edit_data(self, row, col, text):
 
-        column_dtype = self.df.dtypes[col].type
+        dtype = self.df_unfiltered.dtypes.iloc[col]
         # type should always be str when being called from PyQt GUI but someone might call this directly
         if type(text) == str:
-            value = parse_cell(text, column_dtype)
+            value = get_cell_parser(dtype)(text)
+        else:
+            value = text
 
         # Map the row number in the filtered df (which the user interacts with) to the unfiltered one
         row = self.filtered_index_map[row]
         old_val = self.df_unfiltered.iat[row, col]
-        if old_val != value and not (pd.isna(old_val) and pd.isna(value)):
-            self.df_unfiltered.iat[row, col] = value
-            self.apply_filters()
-
-            self.add_history_item("edit_data",
-                                  f"df.iat[{row}, {col}] = {repr(value)}")
+        old_missing = pd.api.types.is_scalar(old_val) and pd.isna(old_val)
+        missing = pd.api.types.is_scalar(value) and pd.isna(value)
+        if old_missing != missing or (not missing and not old_missing and old_val != value):
+            with self.undo_step("Edit cell") as step:
+                statistics_key = self.get_column_statistics_key(self.df_unfiltered.columns[col])
+                if isinstance(dtype, pd.CategoricalDtype) and not missing and value not in dtype.categories:
+                    self.replace_column(step, col, self.df_unfiltered.iloc[:, col].cat.add_categories([value]))
+                self.write_cells(step, col, np.array([row]), pd.Series([value]))
+                self.apply_filters(DataChange('cells', rows=[row], columns=[col]))
+                self.update_column_statistics(col, statistics_key, old_val, self.df_unfiltered.iat[row, col])
+
+                self.add_history_item("edit_data",
+                                      f"df.iat[{row}, {col}] = {repr(value)}")
 
     @status_message_decorator("Pasting data...")
     def paste_data(self, top_row, left_col, df_to_paste):
-        new_df = self.df_unfiltered.copy()
-
-        # Not using iat here because it won't work with MultiIndex
-        for i in range(df_to_paste.shape[0]):
+        # Cells past the end of the DataFrame are dropped
+        df_to_paste = df_to_paste.iloc[:len(self.filtered_index_map) - top_row,
+                                       :len(self.df_unfiltered.columns) - left_col]
+        positions = self.filtered_index_map[top_row: top_row + df_to_paste.shape[0]]
+        if df_to_paste.size == 0:
+            return
+
+        with self.undo_step("Paste") as step:
+            # Write each column of the pasted block at once, converted to the column's dtype when that loses nothing.
+            # Otherwise the assignment upcasts the column, like pasting values one at a time did
             for j in range(df_to_paste.shape[1]):
-                value = df_to_paste.iloc[i, j]
-                new_df.at[self.df.index[top_row + i],
-                          self.df.columns[left_col + j]] = value
-
-        self.df_unfiltered = new_df
-        self.apply_filters()
-
-        self.add_history_item("paste_data", inspect.cleandoc(
-            f"""
-            df_to_paste = pd.DataFrame({df_to_paste.to_dict(orient='list')})
-            for i in range(df_to_paste.shape[0]):
+                col = left_col + j
+                dtype = self.df_unfiltered.dtypes.iloc[col]
+                values = df_to_paste.iloc[:, j]
+                if isinstance(dtype, pd.CategoricalDtype):
+                    new_categories = values[values.notna() & ~values.isin(dtype.categories)].unique()
+                    if len(new_categories) > 0:
+                        column = self.df_unfiltered.iloc[:, col].cat.add_categories(new_categories)
+                        self.replace_column(step, col, column)
+                        dtype = column.dtype
+                self.write_cells(step, col, positions, coerce_to_dtype(values, dtype))
+
+            rows = list(positions)
+            columns = list(range(left_col, left_col + df_to_paste.shape[1]))
+            self.apply_filters(DataChange('cells', rows=rows, columns=columns))
+
+            target_rows = f"{positions.tolist()}" if self.any_rows_rearranged() else \
+                f"slice({top_row}, {top_row + df_to_paste.shape[0]})"
+            self.add_history_item("paste_data", inspect.cleandoc(
+                f"""
+                df_to_paste = pd.DataFrame({df_to_paste.to_dict(orient='list')})
                 for j in range(df_to_paste.shape[1]):
-                    value = df_to_paste.iloc[i, j]
-                    df.at[df.index[{top_row} + i],
-                          df.columns[{left_col} + j]] = value
-            """))
+                    df.iloc[{target_rows}, {left_col} + j] = df_to_paste.iloc[:, j].values
+                """))
 
     ###################################
     # Changing columns
@@ -440,32 +1143,30 @@ class PandasGuiDataFrameStore(PandasGuiStoreItem):
     def delete_column(self, ix: int):
 
         col_name = self.df_unfiltered.columns[ix]
-        self.df_unfiltered = self.df_unfiltered.drop(col_name, axis=1)
+        with self.undo_step("Delete column") as step:
+            # Copied so the rest of the old block isn't kept in memory through it
+            column = self.df_unfiltered.iloc[:, ix].reset_index(drop=True).copy()
+            self.df_unfiltered = self.df_unfiltered.drop(col_name, axis=1)
+            step.deltas.append(ColumnDelta(ix, col_name, column, None))
 
-        # Need to inform the PyQt model too so column widths properly shift
-        self.dataframe_viewer._remove_column(ix)
+            self.add_history_item("delete_column",
+                                  f"df = df.drop('{col_name}', axis=1)")
 
-        self.add_history_item("delete_column",
-                              f"df = df.drop('{col_name}', axis=1)")
-
-        self.apply_filters()
+            self.apply_filters(DataChange('column_removed', columns=[ix]))
 
     @status_message_decorator("Moving columns...")
     def move_column(self, src: int, dest: int):
-        cols = list(self.df_unfiltered.columns)
-        cols.insert(dest, cols.pop(src))
-        self.df_unfiltered = self.df_unfiltered.reindex(cols, axis=1)
-
-        self.add_history_item("move_column",
-                              (f"cols = list(df.columns)"
-                               f"cols.insert({dest}, cols.pop({src}))"
-                               f"df = df.reindex(cols, axis=1)"))
-
-        self.dataframe_viewer.setUpdatesEnabled(False)
-        # Need to inform the PyQt model too so column widths properly shift
-        self.dataframe_viewer._move_column(src, dest)
-        self.apply_filters()
-        self.dataframe_viewer.setUpdatesEnabled(True)
+        order = list(range(len(self.df_unfiltered.columns)))
+        order.insert(dest, order.pop(src))
+        with self.undo_step("Move column") as step:
+            self._reorder_columns(order, step)
+
+            self.add_history_item("move_column",
+                                  (f"cols = list(df.columns)"
+                                   f"cols.insert({dest}, cols.pop({src}))"
+                                   f"df = df.reindex(cols, axis=1)"))
+
+            self.apply_filters(DataChange('columns_moved', movements=[(src, dest)]))
 
     @status_message_decorator("Reordering columns...")
     def reorder_columns(self, columns: List[str]):
@@ -474,104 +1175,248 @@ class PandasGuiDataFrameStore(PandasGuiStoreItem):
 
         original_columns = list(self.df_unfiltered.columns)
 
-        self.df_unfiltered = self.df_unfiltered.reindex(columns=columns)
+        with self.undo_step("Reorder columns") as step:
+            self._reorder_columns(self.df_unfiltered.columns.get_indexer(columns), step)
 
-        self.dataframe_viewer.setUpdatesEnabled(False)
-        # Move columns around in TableView to maintain column widths
-        for (src, dest) in get_movements(original_columns, columns):
-            self.dataframe_viewer._move_column(src, dest, refresh=False)
-        self.apply_filters()
-        self.dataframe_viewer.setUpdatesEnabled(True)
+            self.apply_filters(DataChange('columns_moved', movements=get_movements(original_columns, columns)))
 
-        self.add_history_item("reorder_columns",
-                              f"df = df.reindex(columns={columns})")
+            self.add_history_item("reorder_columns",
+                                  f"df = df.reindex(columns={columns})")
+
+    def _reorder_columns(self, order, step: UndoStep = None):
+        order = np.asarray(order)
+        self.df_unfiltered = self.df_unfiltered.iloc[:, order]
+        if step is not None:
+            step.deltas.append(OrderDelta(order))
 
     ###################################
     # Sorting
 
     @status_message_decorator("Sorting column...")
-    def sort_column(self, ix: int, next_sort_state: Literal['Asc', 'Desc', 'None'] = None):
-        col_name = self.df_unfiltered.columns[ix]
+    def sort_column(self, ix: int, next_sort_state: Literal['Asc', 'Desc', 'None'] = None, append=False):
+        """
+        Sort rows by column ix. With append (shift-clicking a header), the column is added as a secondary sort key after
+        the current ones, or its key is changed or removed if it has one. Otherwise it replaces the current sort
+        """
+        name = self.df_unfiltered.columns[ix]
+        if append and self.sort_state != 'None' and self.sorted_column_name is not None:
+            keys = [(self.sorted_column_name, self.sort_state)] + self.secondary_sort_columns
+            current_state = self.get_column_sort_state(ix)
+        else:
+            keys = []
+            current_state = self.sort_state if ix == self.sorted_column_ix else 'None'
 
-        # Determine next sorting state by current state
+        # Determine next sorting state by current state. After descending the column's key is removed, which resets to
+        # the order of df_unfiltered if it was the only one
         if next_sort_state is None:
-            # Clicked an unsorted column
-            if ix != self.sorted_column_ix:
-                next_sort_state = 'Asc'
-            # Clicked a sorted column
-            elif ix == self.sorted_column_ix and self.sort_state == 'Asc':
-                next_sort_state = 'Desc'
-            # Clicked a reverse sorted column - reset to sorted by index
-            elif ix == self.sorted_column_ix:
-                next_sort_state = 'None'
-
-        if next_sort_state == 'Asc':
-            self.df_unfiltered = self.df_unfiltered.sort_values(col_name, ascending=True, kind='mergesort')
-            self.sorted_column_name = self.df_unfiltered.columns[ix]
-            self.sort_state = 'Asc'
-
-            self.add_history_item("sort_column",
-                                  f"df = df.sort_values('{self.df_unfiltered.columns[ix]}', ascending=True, kind='mergesort')")
-
-        elif next_sort_state == 'Desc':
-            self.df_unfiltered = self.df_unfiltered.sort_values(col_name, ascending=False, kind='mergesort')
-            self.sorted_column_name = self.df_unfiltered.columns[ix]
-            self.sort_state = 'Desc'
-
-            self.add_history_item("sort_column",
-                                  f"df = df.sort_values('{self.df_unfiltered.columns[ix]}', ascending=False, kind='mergesort')")
-
-        elif next_sort_state == 'None':
-            self.df_unfiltered = self.df_unfiltered.sort_index(ascending=True, kind='mergesort')
-            self.sorted_column_name = None
-            self.sort_state = 'None'
+            next_sort_state = {'None': 'Asc', 'Asc': 'Desc', 'Desc': 'None'}[current_state]
 
-            self.add_history_item("sort_column",
-                                  "df = df.sort_index(ascending=True, kind='mergesort')")
+        names = [key_name for key_name, _ in keys]
+        position = names.index(name) if name in names else len(keys)
+        keys[position:position + 1] = [] if next_sort_state == 'None' else [(name, next_sort_state)]
 
-        self.sorted_index_level = None
-        self.apply_filters()
+        with self.undo_step("Sort"):
+            self.sorted_column_name, self.sort_state = keys[0] if keys else (None, 'None')
+            self.secondary_sort_columns = keys[1:]
+            self.sorted_index_level = None
+            self.update_sort_order()
+            self.apply_filters(DataChange('sort'))
+
+        if self.gui is not None:
+            self.gui.update_code_export()
 
     @status_message_decorator("Sorting index...")
     def sort_index(self, ix: int):
         # Clicked an unsorted index level
         if ix != self.sorted_index_level:
-            self.df_unfiltered = self.df_unfiltered.sort_index(level=ix, ascending=True, kind='mergesort')
-            self.sorted_index_level = ix
-            self.sort_state = 'Asc'
-
-            self.add_history_item("sort_index",
-                                  f"df = df.sort_index(level={ix}, ascending=True, kind='mergesort')")
-
+            next_sort_state = 'Asc'
         # Clicked a sorted index level
-        elif ix == self.sorted_index_level and self.sort_state == 'Asc':
-            self.df_unfiltered = self.df_unfiltered.sort_index(level=ix, ascending=False, kind='mergesort')
-            self.sorted_index_level = ix
-            self.sort_state = 'Desc'
+        elif self.sort_state == 'Asc':
+            next_sort_state = 'Desc'
+        # Clicked a reverse sorted index level - reset to the order of df_unfiltered
+        else:
+            next_sort_state = 'None'
 
-            self.add_history_item("sort_index",
-                                  f"df = df.sort_index(level={ix}, ascending=False, kind='mergesort')")
+        with self.undo_step("Sort"):
+            self.sorted_index_level = None if next_sort_state == 'None' else ix
+            self.sorted_column_name = None
+            self.secondary_sort_columns = []
+            self.sort_state = next_sort_state
+            self.update_sort_order()
+            self.apply_filters(DataChange('sort'))
 
-        # Clicked a reverse sorted index level - reset to sorted by full index
-        elif ix == self.sorted_index_level:
-            self.df_unfiltered = self.df_unfiltered.sort_index(ascending=True, kind='mergesort')
+        if self.gui is not None:
+            self.gui.update_code_export()
 
+    def update_sort_order(self):
+        """
+        Set sort_order for the current sort state. This is fast when the sorted columns haven't changed since they were
+        last sorted, see get_sort_order and get_lexsort_order
+        """
+        if self.sort_state == 'None':
+            self.sort_order = None
+        elif self.sorted_column_name is not None:
+            keys = [(self.sorted_column_name, self.sort_state)] + self.secondary_sort_columns
+            # Columns that were removed are skipped
+            columns = [(self.get_column_ix(name), state == 'Asc') for name, state in keys]
+            columns = [(ix, ascending) for ix, ascending in columns if ix is not None]
+            if len(columns) == 1:
+                self.sort_order = self.get_sort_order(('column', columns[0][0]), columns[0][1])
+            else:
+                self.sort_order = self.get_lexsort_order(columns) if columns else None
+        else:
+            self.sort_order = self.get_sort_order(('index', self.sorted_index_level), self.sort_state == 'Asc')
+
+    # Number of columns, index levels and column combinations whose sort orders and keys are kept
+    sort_cache_size = 4
+
+    def get_sort_cache(self, key: tuple, version: tuple) -> dict:
+        # The cached sort orders and keys for key, emptied if they're for an older version. The most recently used are
+        # last, and the oldest are dropped
+        cached_version, cache = self.sort_orders.pop(key, (None, {}))
+        if cached_version != version:
+            cache = {}
+        self.sort_orders[key] = (version, cache)
+        while len(self.sort_orders) > self.sort_cache_size:
+            self.sort_orders.pop(next(iter(self.sort_orders)))
+        return cache
+
+    def get_column_sort_cache(self, ix: int) -> dict:
+        version = (self.rows_version, self.column_versions.get(self.df_unfiltered.columns[ix], 0))
+        return self.get_sort_cache(('column', self.get_statistics_cache_key(ix)), version)
+
+    def get_column_sort_key(self, ix: int) -> tuple:
+        # get_sort_key of column ix, kept with its sort orders so sorts by several columns don't compute it again
+        cache = self.get_column_sort_cache(ix)
+        if 'key' not in cache:
+            cache['key'] = get_sort_key(self.df_unfiltered.iloc[:, ix])
+        return cache['key']
+
+    def get_sort_order(self, source: tuple, ascending: bool) -> np.ndarray:
+        """
+        Positions of df_unfiltered rows sorted by source, which is ('column', ix) or ('index', level), with missing
+        values last. Equivalent to sort_values or sort_index with kind='mergesort'.
+
+        Orders are kept until the rows or the sorted column change. When the order for the other direction is kept,
+        this one is worked out from it with reverse_sort_order instead of sorting again. Except for a MultiIndex, which
+        pandas doesn't sort stably
+        """
+        kind, ix = source
+        if kind == 'column':
+            cache = self.get_column_sort_cache(ix)
+        else:
+            cache = self.get_sort_cache(source, (self.rows_version,))
+
+        if ascending not in cache:
+            reversible = kind == 'column' or not isinstance(self.df_unfiltered.index, pd.MultiIndex)
+            if reversible and (not ascending) in cache:
+                cache[ascending] = reverse_sort_order(cache[not ascending],
+                                                      *self.get_sorted_values(source, cache[not ascending]))
+            elif kind == 'column':
+                cache[ascending] = self._column_sort_order(ix, ascending)
+            else:
+                cache[ascending] = self._index_sort_order(ascending, level=ix)
+        return cache[ascending]
+
+    def get_lexsort_order(self, columns: List[Tuple[int, bool]]) -> np.ndarray:
+        """
+        Positions of df_unfiltered rows sorted by several columns, given as (ix, ascending) from the first sort key to
+        the last. Equivalent to sort_values with a list of columns and kind='mergesort'. The sort keys of the columns
+        are cached, so adding a secondary key only computes the key of the added column before sorting
+        """
+        key = ('columns', tuple((self.get_statistics_cache_key(ix), ascending) for ix, ascending in columns))
+        version = (self.rows_version,) + tuple(self.column_versions.get(self.df_unfiltered.columns[ix], 0)
+                                               for ix, _ in columns)
+        cache = self.get_sort_cache(key, version)
+        if 'order' not in cache:
+            keys = []
+            for ix, ascending in columns:
+                sort_key, missing = self.get_column_sort_key(ix)
+                keys.append(sort_key if ascending else reverse_sort_key(sort_key, missing))
+            # lexsort sorts by the last key first
+            cache['order'] = np.lexsort(keys[::-1])
+        return cache['order']
+
+    def get_sorted_values(self, source: tuple, order: np.ndarray) -> tuple:
+        # The values get_sort_order sorts on for source taken in the order of order, and the number that aren't missing
+        kind, ix = source
+        if kind == 'column':
+            values, missing = self.get_column_sort_key(ix)
+        else:
+            values = self.df_unfiltered.index.array
+            missing = pd.isna(values)
+        valid = len(values) - int(missing.sum())
+        return [values.take(order[:valid])], valid
+
+    # Positions of df_unfiltered rows in the order given by sorting on a column. Equivalent to DataFrame.sort_values
+    def _column_sort_order(self, ix: int, ascending: bool):
+        key, missing = self.get_column_sort_key(ix)
+        return np.argsort(key if ascending else reverse_sort_key(key, missing), kind='stable')
+
+    # Positions of df_unfiltered rows in the order given by sorting on the index. Equivalent to DataFrame.sort_index
+    def _index_sort_order(self, ascending: bool, level: int = None):
+        positions = pd.Series(np.arange(len(self.df_unfiltered)), index=self.df_unfiltered.index)
+        # Sorting a single level index by level isn't stable
+        if not isinstance(positions.index, pd.MultiIndex):
+            level = None
+        return positions.sort_index(level=level, ascending=ascending, kind='mergesort').values
+
+    def replace_df(self, df: DataFrame):
+        """
+        Replace all the data with df. When it has the same rows and columns, views are updated in place and the sort and
+        filters are kept, otherwise they're reset
+        """
+        # The change isn't recorded as deltas, so the steps before it can't be undone
+        self.undo_log.clear()
+        current = self.df_unfiltered
+        same_labels = (df.columns.equals(current.columns) and df.index.is_unique and len(df.index) == len(current.index)
+                       and df.index.isin(current.index).all())
+        if not same_labels:
+            self.df_unfiltered = df.copy()
+            self.sorted_column_name = None
             self.sorted_index_level = None
             self.sort_state = 'None'
-
-            self.add_history_item("sort_index",
-                                  "df = df.sort_index(ascending=True, kind='mergesort')")
-
-        self.sorted_column = None
-        self.apply_filters()
+            self.secondary_sort_columns = []
+            self.apply_filters(DataChange('reset'))
+            return
+
+        # Rows are sorted and filtered again by the new values
+        self.df_unfiltered = df.reindex(current.index)
+        self.apply_filters(DataChange('cells'))
+
+    def stop_threads(self):
+        if self.loader is not None:
+            self.loader.stop()
+        for thread in self.filter_threads + self.statistics_threads:
+            thread.stop()
+        self.filter_threads = []
+        self.statistics_threads = []
+
+    def append_rows(self, df: DataFrame):
+        """
+        Add rows to the end of the DataFrame, keeping the current sort. Used for files loaded in the background
+        """
+        df.columns = self.df_unfiltered.columns
+        start = len(self.df_unfiltered)
+        self.df_unfiltered = pd.concat([self.df_unfiltered, df])
+        self.row_ids = np.concatenate([self.row_ids, np.arange(start, start + len(df))])
+        self.rows_version += 1
+
+        if self.sort_state == 'None':
+            # Rows are in the order they were loaded
+            self.apply_filters(DataChange('filter'))
+        else:
+            self.update_sort_order()
+            self.apply_filters(DataChange('sort'))
 
     def change_column_type(self, ix: int, type):
         name = self.df_unfiltered.columns[ix]
-        self.df_unfiltered[name] = self.df_unfiltered[name].astype(type)
-        self.apply_filters()
+        with self.undo_step("Change column type") as step:
+            self.replace_column(step, ix, self.df_unfiltered.iloc[:, ix].astype(type))
+            self.apply_filters(DataChange('cells', columns=[ix]))
 
-        self.add_history_item("change_column_type",
-                              f"df[{name}] = df[{name}].astype({type})")
+            self.add_history_item("change_column_type",
+                                  f"df[{name}] = df[{name}].astype({type})")
 
     ###################################
     # Filters
@@ -599,32 +1444,190 @@ class PandasGuiDataFrameStore(PandasGuiStoreItem):
         self.apply_filters()
 
     @status_message_decorator("Applying filters...")
-    def apply_filters(self):
-        df = self.df_unfiltered.copy()
-        df['_temp_range_index'] = df.reset_index().index
+    def apply_filters(self, change: DataChange = None):
+        """
+        Recompute self.df from self.df_unfiltered and the enabled filters.
+        change describes what was modified before this was called, and defaults to the filters changing
+        """
+        if change is None:
+            change = DataChange('filter')
+
+        # Any filters still being evaluated are for outdated data or filters
+        self.filter_generation += 1
+        for thread in self.filter_threads:
+            thread.cancel()
+        self.filter_threads = [thread for thread in self.filter_threads if not thread.isFinished()]
+        # Cancelled threads never report back, so stop their spinner here. It's restarted if a new thread is started
+        if self.dataframe_viewer is not None:
+            self.dataframe_viewer.spinner.stop()
+
+        # Sorting doesn't change df_unfiltered, so filter masks are still valid after it
+        if change.kind == 'reset':
+            self.rows_version += 1
+        elif change.kind == 'cells':
+            self.update_filter_masks(change)
+            # Rows are kept sorted by their new values, like they're filtered by them
+            if self.sort_state != 'None' and self.sorted_column_name is not None and \
+                    (change.columns is None or any(self.get_column_sort_state(ix) != 'None' for ix in change.columns)):
+                self.update_sort_order()
+                change = change.merge(DataChange('sort'))
+        if change.kind in ['column_removed', 'columns_moved'] and not self.df_unfiltered.columns.is_unique:
+            # Sort orders of columns with duplicate names are cached by position
+            self.sort_orders = {}
+        if change.kind == 'reset':
+            # Rows may have been added or removed so they can't be tracked through the change
+            self.row_ids = np.arange(len(self.df_unfiltered))
+            # Columns may have been replaced without their versions changing
+            self.statistics_cache = {}
+            self.update_sort_order()
+
+        # When only the filters changed, the rows shown are still valid so the table can keep showing them while the
+        # filters are evaluated in the background. Other changes have to be applied right away
+        if change.kind == 'filter' and self.gui is not None:
+            outdated = [filt for filt in self.filters if filt.enabled and not filt.failed
+                        and filt.mask_key != self.get_filter_mask_key(filt)]
+            if outdated:
+                thread = FilterThread(self, outdated, self.filter_generation, change)
+                thread.masks_evaluated.connect(self.on_masks_evaluated)
+                self.filter_threads.append(thread)
+                thread.start()
+
+                if self.filter_viewer is not None:
+                    self.filter_viewer.list_model.beginResetModel()
+                    self.filter_viewer.list_model.endResetModel()
+                if self.dataframe_viewer is not None:
+                    self.dataframe_viewer.spinner.start()
+                return
+
+        # Values changed in place only need the filtered rows combined again if the changed rows moved in or out
+        if change.kind == 'cells' and 'sort' not in change.kinds and change.rows is not None \
+                and self.filtered_rows_unchanged(change.rows):
+            self._df = None
+            self.data_changed(change)
+            return
+
+        self.combine_filter_masks(change)
+
+    def filtered_rows_unchanged(self, rows: List[int]) -> bool:
+        """
+        Whether rows (positions in df_unfiltered) are in filtered_index_map exactly when they pass the enabled filters,
+        checked with only those rows of the filter masks. False if any filter mask is outdated
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        passes = np.ones(len(rows), dtype=bool)
+        for filt in self.filters:
+            if filt.enabled and not filt.failed:
+                if filt.mask is None or filt.mask_key != self.get_filter_mask_key(filt):
+                    return False
+                passes &= filt.mask[rows]
+
+        shown = np.ones(len(rows), dtype=bool) if self.filter_mask is None else self.filter_mask[rows]
+        return np.array_equal(passes, shown)
+
+    def on_masks_evaluated(self, result):
+        thread, results = result
+        if thread.generation != self.filter_generation:
+            return
+
+        for filt, mask, key, error in results:
+            if error is None:
+                filt.mask = mask
+                filt.mask_key = key
+            else:
+                filt.failed = True
+                logger.error(f"Filter {repr(filt.expr)} failed", exc_info=error)
 
+        if self.dataframe_viewer is not None:
+            self.dataframe_viewer.spinner.stop()
+        self.combine_filter_masks(thread.change)
+
+    def combine_filter_masks(self, change: DataChange):
+        # Combine the masks of the enabled filters, so toggling or editing one filter only evaluates that one
+        mask = None
         for ix, filt in enumerate(self.filters):
             if filt.enabled and not filt.failed:
                 try:
-                    df = df.query(filt.expr)
-                    # Handle case where filter returns only one row
-                    if isinstance(df, pd.Series):
-                        df = df.to_frame().T
+                    filter_mask = self.get_filter_mask(filt)
                 except Exception as e:
                     self.filters[ix].failed = True
                     logger.exception(e)
+                    continue
+                # Copied so the filter's mask can be updated in place without changing filter_mask
+                mask = filter_mask.copy() if mask is None else mask & filter_mask
+
+        # self.filtered_index_map is used elsewhere to map filtered index to unfiltered index
+        self.filter_mask = mask
+        if self.sort_order is None:
+            self.filtered_index_map = np.arange(len(self.df_unfiltered)) if mask is None else np.flatnonzero(mask)
+        else:
+            self.filtered_index_map = self.sort_order if mask is None else self.sort_order[mask[self.sort_order]]
+        self._df = None
+
+        self.data_changed(change)
+
+    def get_filter_mask(self, filt: Filter) -> np.ndarray:
+        """
+        Boolean array of the rows in df_unfiltered that pass the filter, equivalent to df.query(filt.expr)
+        """
+        key = self.get_filter_mask_key(filt)
+        if filt.mask_key != key:
+            filt.mask = self.evaluate_filter(self.df_unfiltered, filt.expr)
+            filt.mask_key = key
+        return filt.mask
+
+    def get_filter_mask_key(self, filt: Filter) -> tuple:
+        """
+        The version of the data a filter's mask depends on, which is the rows and the values of the columns it uses, or
+        of all columns if they can't be worked out from the expression
+        """
+        columns = self.df_unfiltered.columns
+        names, elementwise = parse_query_expr(filt.expr)
+        names = columns if names is None else sorted(names)
+        # Names that aren't columns are index levels or Python names. Columns that are removed change the key
+        return (filt.expr, self.rows_version,
+                tuple(self.column_versions.get(name, 0) if name in columns else None for name in names))
 
-        # self.filtered_index_map is used elsewhere to map unfiltered index to filtered index
-        self.filtered_index_map = df['_temp_range_index'].reset_index(drop=True)
-        df = df.drop('_temp_range_index', axis=1)
-
-        self.df = df
-        self.data_changed()
+    @staticmethod
+    def evaluate_filter(df: DataFrame, expr: str) -> np.ndarray:
+        result = df.eval(expr)
+        if np.ndim(result) == 0:
+            # Expressions like "True" that don't depend on the data
+            return np.full(len(df), bool(result))
+        elif isinstance(result, pd.Series) and pd.api.types.is_bool_dtype(result):
+            return result.fillna(False).to_numpy(dtype=bool)
+        else:
+            raise TypeError(f"Filter expression did not evaluate to True or False for each row: {expr}")
+
+    def update_filter_masks(self, change: DataChange):
+        """
+        Update the column versions for a 'cells' change. Masks of elementwise filters that were valid before the change
+        only need the changed rows checked again, the rest get evaluated again when they are next used
+        """
+        columns = self.df_unfiltered.columns
+        recheck = []
+        if change.rows is not None:
+            recheck = [filt for filt in self.filters if filt.enabled and not filt.failed and filt.mask is not None
+                       and parse_query_expr(filt.expr)[1] and filt.mask_key == self.get_filter_mask_key(filt)]
+
+        for ix in range(len(columns)) if change.columns is None else change.columns:
+            self.column_versions[columns[ix]] = self.column_versions.get(columns[ix], 0) + 1
+
+        for filt in recheck:
+            key = self.get_filter_mask_key(filt)
+            # Filters that don't use the changed columns are still valid
+            if filt.mask_key != key:
+                try:
+                    filt.mask[change.rows] = self.evaluate_filter(self.df_unfiltered.iloc[change.rows], filt.expr)
+                    filt.mask_key = key
+                except Exception:
+                    # Evaluate the whole column again so the error is reported
+                    filt.mask_key = None
 
     # Convert all columns to datetime where possible
     def parse_all_dates(self):
         df = self.df_unfiltered
         converted_names = []
+        converted = []
         dtypes_old = df.dtypes
         df = parse_all_dates(df)
         dtypes_new = df.dtypes
@@ -636,6 +1639,7 @@ class PandasGuiDataFrameStore(PandasGuiStoreItem):
             try:
                 if dtypes_old[ix] != dtypes_new[ix]:
                     converted_names.append(str(col_name))
+                    converted.append(ix)
             except:
                 pass
 
@@ -644,42 +1648,61 @@ class PandasGuiDataFrameStore(PandasGuiStoreItem):
         else:
             logger.warning(f"In {self.name}, unable to parse any columns as datetime")
 
-        self.df_unfiltered = df
-        self.apply_filters()
+        with self.undo_step("Parse dates") as step:
+            for ix in converted:
+                self.replace_column(step, ix, df.iloc[:, ix])
+            self.apply_filters(DataChange('cells'))
 
     # Convert a single column to date
     def parse_date(self, ix):
         df = self.df_unfiltered
         name = list(df.columns)[ix]
 
-        dtype_old = df[name].dtype
-        df[name] = parse_date(df[name])
-        dtype_new = df[name].dtype
+        dtype_old = df.dtypes.iloc[ix]
+        column = parse_date(df.iloc[:, ix])
+        dtype_new = column.dtype
 
         if dtype_old != dtype_new:
             logger.info(f"In {self.name}, converted {name} to datetime")
         else:
             logger.warning(f"In {self.name}, unable to convert {name} to datetime")
 
-        self.df_unfiltered = df
-        self.apply_filters()
+        with self.undo_step("Parse date") as step:
+            self.replace_column(step, ix, column)
+            self.apply_filters(DataChange('cells', columns=[ix]))
 
     ###################################
     # Other
 
-    def data_changed(self):
-        self.refresh_ui()
-        self.refresh_statistics()
-        # Remake Grapher plot
-        if self.dataframe_explorer is not None:
-            self.dataframe_explorer.grapher.on_dragger_finished()
+    def data_changed(self, change: DataChange = None):
+        """
+        Notify views of a change. In the GUI, changes made until control returns to the event loop are merged and
+        views are notified once, otherwise they are notified right away
+        """
+        if change is None:
+            change = DataChange('reset')
+        self.data_version += 1
+        self.change_bus.post(change)
+        if self.gui is None:
+            self.change_bus.flush()
+
+    def update_statistics(self, change: DataChange):
+        if not self.statistics_enabled:
+            return
+        # Statistics are only computed while they're shown, see StatisticsViewer.showEvent
+        if self.dataframe_explorer is None or is_shown(self.dataframe_explorer.statistics_viewer):
+            self.refresh_statistics()
+        else:
+            self.statistics_outdated = True
 
     # Refresh PyQt models when the underlying pgdf is changed in anyway that needs to be reflected in the GUI
-    def refresh_ui(self):
+    def refresh_ui(self, change: DataChange = None):
+        if change is None:
+            change = DataChange('reset')
 
         self.models = []
 
-        if self.filter_viewer is not None:
+        if self.filter_viewer is not None and change.kinds & {'reset', 'filter'}:
             self.models += [self.filter_viewer.list_model]
 
         for model in self.models:
@@ -687,13 +1710,16 @@ class PandasGuiDataFrameStore(PandasGuiStoreItem):
             model.endResetModel()
 
         if self.dataframe_viewer is not None:
-            self.dataframe_viewer.refresh_ui()
+            self.dataframe_viewer.refresh_ui(change)
 
     @staticmethod
     def cast(df: Union[PandasGuiDataFrameStore, pd.DataFrame, pd.Series, Iterable]):
         if isinstance(df, PandasGuiDataFrameStore):
             return df
         if isinstance(df, pd.DataFrame):
+            # Keep frames derived from a PandasGuiArrowStore (like the ones made for Grapher and Reshaper) out of memory
+            if any(is_arrow_dtype(dtype) for dtype in df.dtypes):
+                return PandasGuiArrowStore(df.copy())
             return PandasGuiDataFrameStore(df.copy())
         elif isinstance(df, pd.Series):
             return PandasGuiDataFrameStore(df.to_frame())
@@ -704,6 +1730,364 @@ class PandasGuiDataFrameStore(PandasGuiStoreItem):
                 raise TypeError(f"Could not convert {type(df)} to DataFrame")
 
 
+class PandasGuiArrowStore(PandasGuiDataFrameStore):
+    """
+    PandasGuiDataFrameStore backed by a memory mapped Arrow IPC (Feather v2) file instead of a DataFrame in memory.
+    The columns are pandas ArrowDtype arrays that point into the mapped file, so copying, sorting and filtering them
+    only allocates the index and the rows taken, and the table view, find and statistics read only the slices they
+    need. Columns are converted to regular numpy backed columns the first time they are modified.
+    """
+
+    @classmethod
+    def from_file(cls, path: str, name: str = 'Untitled'):
+        import pyarrow as pa
+        table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+        return cls(table.to_pandas(types_mapper=pd.ArrowDtype), name)
+
+    @classmethod
+    def from_parquet(cls, path: str, name: str = 'Untitled'):
+        """
+        Parquet data is compressed so it can't be mapped directly. Convert it to an uncompressed Arrow file in the
+        temp dir one row group at a time, so the whole file is never in memory at once, and map that instead
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        import tempfile
+        import atexit
+
+        parquet_file = pq.ParquetFile(path)
+        fd, arrow_path = tempfile.mkstemp(suffix='.arrow', prefix='pandasgui_')
+        os.close(fd)
+        with pa.OSFile(arrow_path, 'wb') as sink:
+            with pa.ipc.new_file(sink, parquet_file.schema_arrow) as writer:
+                for i in range(parquet_file.num_row_groups):
+                    writer.write_table(parquet_file.read_row_group(i))
+
+        pgdf = cls.from_file(arrow_path, name)
+        # The mapping stays valid after the file is unlinked, except on Windows where it has to wait until exit
+        try:
+            os.remove(arrow_path)
+        except OSError:
+            atexit.register(lambda: os.path.exists(arrow_path) and os.remove(arrow_path))
+        return pgdf
+
+    # Replace arrow backed columns with numpy backed copies so they can be modified in place
+    def _materialize(self, columns: List[int] = None):
+        if columns is None:
+            columns = range(self.df_unfiltered.shape[1])
+        for ix in columns:
+            column = self.df_unfiltered.iloc[:, ix]
+            if is_arrow_dtype(column.dtype):
+                self.df_unfiltered.isetitem(ix, to_numpy_backed(column))
+                self._df = None
+
+    def edit_data(self, row, col, text):
+        self._materialize([col])
+        super().edit_data(row, col, text)
+
+    def paste_data(self, top_row, left_col, df_to_paste):
+        self._materialize(range(left_col, min(left_col + df_to_paste.shape[1], self.df_unfiltered.shape[1])))
+        super().paste_data(top_row, left_col, df_to_paste)
+
+    def change_column_type(self, ix: int, type):
+        self._materialize([ix])
+        super().change_column_type(ix, type)
+
+    def parse_date(self, ix):
+        self._materialize([ix])
+        super().parse_date(ix)
+
+    def parse_all_dates(self):
+        import pyarrow as pa
+        # Only string columns get parsed
+        self._materialize([ix for ix, dtype in enumerate(self.df_unfiltered.dtypes)
+                           if isinstance(dtype, pd.ArrowDtype) and pa.types.is_string(dtype.pyarrow_dtype)])
+        super().parse_all_dates()
+
+    def compute_column_statistics(self, column: pd.Series, approximate=False) -> ColumnStatistics:
+        """
+        Compute statistics with pyarrow kernels, which stream over the mapped columns. The pandas methods used by
+        PandasGuiDataFrameStore.compute_column_statistics would copy the data. These are always exact, count_distinct
+        only keeps the unique values
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        if not is_arrow_dtype(column.dtype):
+            # Columns that were modified since loading
+            return super().compute_column_statistics(column, approximate)
+
+        array = pa.array(column.array)
+        statistics = ColumnStatistics(type=str(column.dtype), count=pc.count(array).as_py(),
+                                      nunique=pc.count_distinct(array).as_py())
+        if pa.types.is_integer(array.type) or pa.types.is_floating(array.type) or pa.types.is_boolean(array.type):
+            values = pc.cast(array, pa.int8()) if pa.types.is_boolean(array.type) else array
+            min_max = pc.min_max(array)
+            mean = pc.mean(values).as_py()
+            std = pc.stddev(values, ddof=1).as_py()
+            statistics.mean = np.nan if mean is None else mean
+            statistics.m2 = std ** 2 * (statistics.count - 1) if std is not None else 0.0
+            statistics.min = np.nan if min_max['min'].as_py() is None else min_max['min'].as_py()
+            statistics.max = np.nan if min_max['max'].as_py() is None else min_max['max'].as_py()
+        return statistics
+
+    def compute_row_max(self) -> np.ndarray:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        numeric_arrays = []
+        for ix, dtype in enumerate(self.df_unfiltered.dtypes):
+            if is_arrow_dtype(dtype):
+                if pa.types.is_integer(dtype.pyarrow_dtype) or pa.types.is_floating(dtype.pyarrow_dtype):
+                    numeric_arrays.append(pc.cast(pa.array(self.filtered_iloc(columns=ix).array), pa.float64()))
+            elif pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype):
+                column = self.filtered_iloc(columns=ix)
+                numeric_arrays.append(pa.array(column.to_numpy(dtype='float64', na_value=np.nan), from_pandas=True))
+
+        if not numeric_arrays:
+            return np.full(len(self.filtered_index_map), np.nan)
+        row_max = pc.max_element_wise(*numeric_arrays, skip_nulls=True)
+        return row_max.to_numpy(zero_copy_only=False)
+
+
+class ChunkLoaderThread(QtCore.QThread):
+    chunk_loaded = QtCore.pyqtSignal(object)
+
+    def __init__(self, reader: Iterable[DataFrame], loaded_rows: int = 0, parent=None):
+        """
+        Thread that reads the remaining chunks of a file and emits them as DataFrames.
+        Chunks are combined before being emitted, each batch as large as all rows loaded so far, so appending them
+        costs time proportional to the file size overall.
+
+        Args:
+            reader: Iterator of DataFrame chunks, like the result of pd.read_csv with chunksize set
+            loaded_rows: Number of rows already read from the file
+        """
+        QtCore.QThread.__init__(self, parent=parent)
+        self.isRunning = True
+        self.reader = reader
+        self.loaded_rows = loaded_rows
+
+    def run(self):
+        loaded_rows = self.loaded_rows
+        batch = []
+        batch_rows = 0
+        for chunk in self.reader:
+            if not self.isRunning:
+                return
+            batch.append(chunk)
+            batch_rows += len(chunk)
+            if batch_rows >= loaded_rows:
+                self.chunk_loaded.emit(pd.concat(batch))
+                loaded_rows += batch_rows
+                batch = []
+                batch_rows = 0
+
+        if batch and self.isRunning:
+            self.chunk_loaded.emit(pd.concat(batch))
+
+    def stop(self):
+        self.isRunning = False
+        self.wait()
+
+
+class FilterThread(QtCore.QThread):
+    masks_evaluated = QtCore.pyqtSignal(object)
+    # Rows evaluated at a time by elementwise filters, so cancelling doesn't have to wait for the whole column
+    chunk_size = 1_000_000
+
+    def __init__(self, pgdf: PandasGuiDataFrameStore, filters: List[Filter], generation: int, change: DataChange,
+                 parent=None):
+        """
+        Thread that evaluates the masks of filters and emits them along with the mask keys they are valid for.
+        Results are emitted even if evaluating a filter fails, with the exception in place of the mask.
+
+        Args:
+            pgdf: Store the filters belong to
+            filters: Filters to evaluate
+            generation: Value of pgdf.filter_generation when the thread was started, used to ignore outdated results
+            change: The change that caused the filters to be applied
+        """
+        QtCore.QThread.__init__(self, parent=parent)
+        self.isRunning = True
+        self.generation = generation
+        self.change = change
+        # Keep a reference to the data the keys are for, df_unfiltered may be replaced while this runs
+        self.df = pgdf.df_unfiltered
+        self.jobs = [(filt, pgdf.get_filter_mask_key(filt)) for filt in filters]
+        # Cancelled threads still finish the chunk they're evaluating, wait for them instead of competing with them
+        self.previous_threads = [thread for thread in pgdf.filter_threads if not thread.isFinished()]
+
+    def run(self):
+        for thread in self.previous_threads:
+            thread.wait()
+        self.previous_threads = []
+
+        results = []
+        for filt, key in self.jobs:
+            if not self.isRunning:
+                return
+            try:
+                mask = self.evaluate(filt.expr)
+            except Exception as e:
+                results.append((filt, None, key, e))
+                continue
+            if not self.isRunning:
+                return
+            results.append((filt, mask, key, None))
+
+        if self.isRunning:
+            self.masks_evaluated.emit((self, results))
+
+    def evaluate(self, expr: str) -> Union[np.ndarray, None]:
+        if not parse_query_expr(expr)[1] or len(self.df) <= self.chunk_size:
+            return PandasGuiDataFrameStore.evaluate_filter(self.df, expr)
+
+        mask = np.empty(len(self.df), dtype=bool)
+        for start in range(0, len(self.df), self.chunk_size):
+            if not self.isRunning:
+                return None
+            end = start + self.chunk_size
+            mask[start:end] = PandasGuiDataFrameStore.evaluate_filter(self.df.iloc[start:end], expr)
+        return mask
+
+    def cancel(self):
+        # Doesn't wait for the thread, it stops after the chunk it's evaluating
+        self.isRunning = False
+
+    def stop(self):
+        self.cancel()
+        self.wait()
+
+
+class StatisticsThread(QtCore.QThread):
+    column_computed = QtCore.pyqtSignal(object)
+
+    def __init__(self, pgdf: PandasGuiDataFrameStore,
+                 jobs: List[Tuple[int, tuple, Union[ColumnStatistics, None], bool]], generation: int, parent=None):
+        """
+        Thread that computes the statistics of columns and emits each as it finishes. Columns are computed in a thread
+        pool, which runs them in parallel where numpy and pyarrow release the GIL.
+
+        Args:
+            pgdf: Store the columns belong to
+            jobs: (position, key, statistics, approximate) of each column to compute. statistics are the cached ones
+                  that only need the unique count or min and max found again, or None to compute them all
+            generation: Value of pgdf.statistics_generation when the thread was started, used to ignore outdated results
+        """
+        QtCore.QThread.__init__(self, parent=parent)
+        self.isRunning = True
+        self.generation = generation
+        self.jobs = jobs
+        self.compute_column_statistics = pgdf.compute_column_statistics
+        # Keep references to the data as it is now, these may be replaced while this runs
+        self.df = pgdf.df_unfiltered
+        self.positions = pgdf.filtered_index_map if pgdf.any_rows_filtered() else None
+
+    def get_column(self, ix: int) -> pd.Series:
+        return self.df.iloc[:, ix] if self.positions is None else self.df.iloc[self.positions, ix]
+
+    def compute(self, ix: int, statistics: Union[ColumnStatistics, None], approximate: bool) -> ColumnStatistics:
+        column = self.get_column(ix)
+        if statistics is None:
+            return self.compute_column_statistics(column, approximate)
+
+        # Complete a copy, the cached one may be changed while this runs
+        statistics = replace(statistics)
+        if statistics.nunique is None and approximate:
+            statistics.nunique = approximate_nunique(column)
+            statistics.estimates = tuple(dict.fromkeys(statistics.estimates + ('N Unique',)))
+        elif statistics.nunique is None:
+            statistics.nunique = nunique(column.to_frame()).iloc[0]
+        if statistics.min_max_outdated:
+            statistics.min, statistics.max = column.min(), column.max()
+            statistics.min_max_outdated = False
+        return statistics
+
+    def run(self):
+        futures = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=os.cpu_count()) as threads:
+            for ix, key, statistics, approximate in self.jobs:
+                future = threads.submit(self.compute, ix, statistics, approximate)
+                futures[future] = (ix, key, statistics, approximate)
+
+            for future in concurrent.futures.as_completed(futures):
+                if not self.isRunning:
+                    for other in futures:
+                        other.cancel()
+                    return
+                ix, key, statistics, approximate = futures[future]
+                try:
+                    statistics = future.result()
+                except Exception as e:
+                    logger.exception(e)
+                    continue
+                statistics.key = key
+                self.column_computed.emit((self.generation, ix, statistics))
+
+    def cancel(self):
+        # Doesn't wait for the thread, columns already being computed are finished but not emitted
+        self.isRunning = False
+
+    def stop(self):
+        self.cancel()
+        self.wait()
+
+
+class ChangeBus(QtCore.QObject):
+    flush_requested = QtCore.pyqtSignal()
+
+    def __init__(self, parent=None):
+        """
+        Collects the changes made to a PandasGuiDataFrameStore and notifies subscribers of them once per event loop
+        turn, merged into one DataChange. So a burst of changes, like a script making several edits, refreshes each
+        view once. Subscribers are called in the order they subscribed
+        """
+        QtCore.QObject.__init__(self, parent=parent)
+        self.pending: Union[DataChange, None] = None
+        self.subscribers: List[Callable[[DataChange], None]] = []
+        # Number of hold blocks currently running
+        self.holds = 0
+        # Queued so the flush happens after the current event is handled, before any repaints
+        self.flush_requested.connect(self.flush, QtCore.Qt.QueuedConnection)
+
+    def subscribe(self, callback: Callable[[DataChange], None]):
+        self.subscribers.append(callback)
+
+    def post(self, change: DataChange):
+        if self.pending is None:
+            self.pending = change
+            self.flush_requested.emit()
+        else:
+            self.pending = self.pending.merge(change)
+
+    @contextlib.contextmanager
+    def hold(self):
+        """
+        Don't notify subscribers until the end of the block, even if events are processed within it
+        """
+        self.holds += 1
+        try:
+            yield
+        finally:
+            self.holds -= 1
+            if self.holds == 0 and self.pending is not None:
+                self.flush_requested.emit()
+
+    def flush(self):
+        if self.holds > 0:
+            return
+        change = self.pending
+        self.pending = None
+        if change is not None:
+            for callback in self.subscribers:
+                # One failing view shouldn't stop the others from refreshing
+                try:
+                    callback(change)
+                except Exception as e:
+                    logger.exception(e)
+
+
 @dataclass
 class PandasGuiStore:
     """This class stores all state data of the PandasGUI main GUI.
@@ -740,7 +2124,9 @@ class PandasGuiStore:
         exec(command)
 
         for name in dataframes_affected:
-            self.data[name].apply_filters()
+            # The magic isn't recorded as deltas, so the steps before it can't be undone
+            self.data[name].undo_log.clear()
+            self.data[name].apply_filters(DataChange('reset'))
             self.data[name].add_history_item("iPython magic",
                                              refactor_variable(line, name, 'df'))
 
@@ -790,6 +2176,7 @@ class PandasGuiStore:
         item = self.data[name]
         if isinstance(item, PandasGuiDataFrameStore):
             widget = item.dataframe_explorer
+            item.stop_threads()
         else:
             widget = item
 
@@ -810,16 +2197,15 @@ class PandasGuiStore:
         pgdf.gui = self.gui
 
         with self.status_message_context("Cleaning DataFrame..."):
-            pgdf.df = clean_dataframe(pgdf.df, name)
-            pgdf.data_changed()
+            pgdf.df_unfiltered = clean_dataframe(pgdf.df_unfiltered, name)
+            pgdf.apply_filters(DataChange('reset'))
 
         if pgdf.dataframe_explorer is None:
             from pandasgui.widgets.dataframe_explorer import DataFrameExplorer
             pgdf.dataframe_explorer = DataFrameExplorer(pgdf)
 
         # Add to nav
-        shape = pgdf.df.shape
-        shape = f"{shape[0]:,} x {shape[1]:,}"
+        shape = f"{len(pgdf.filtered_index_map):,} x {pgdf.df_unfiltered.shape[1]:,}"
 
         self.add_item(pgdf, name, shape)
 
@@ -832,8 +2218,19 @@ class PandasGuiStore:
             logger.warning("Path is not a file: " + path)
         elif path.endswith(".csv"):
             filename = os.path.split(path)[1].split('.csv')[0]
-            df = pd.read_csv(path, engine='python')
-            self.add_dataframe(df, filename)
+            chunk_size = self.settings.progressive_rows.value
+            if chunk_size:
+                # Show the first rows right away and load the rest in the background once they're shown. This uses the C
+                # parser since the file is parsed while the GUI is running
+                reader = pd.read_csv(path, chunksize=chunk_size)
+                pgdf = PandasGuiDataFrameStore.cast(next(reader))
+                self.add_dataframe(pgdf, filename)
+                pgdf.loader = ChunkLoaderThread(reader, loaded_rows=len(pgdf.df_unfiltered))
+                pgdf.loader.chunk_loaded.connect(pgdf.append_rows)
+                QtCore.QTimer.singleShot(0, pgdf.loader.start)
+            else:
+                df = pd.read_csv(path, engine='python')
+                self.add_dataframe(df, filename)
         elif path.endswith(".xlsx"):
             filename = os.path.split(path)[1].split('.csv')[0]
             df_dict = pd.read_excel(path, sheet_name=None)
@@ -842,8 +2239,14 @@ class PandasGuiStore:
                 self.add_dataframe(df_dict[sheet_name], df_name)
         elif path.endswith(".parquet"):
             filename = os.path.split(path)[1].split('.parquet')[0]
-            df = pd.read_parquet(path, engine='pyarrow')
-            self.add_dataframe(df, filename)
+            if self.settings.memory_map_files.value:
+                self.add_dataframe(PandasGuiArrowStore.from_parquet(path), filename)
+            else:
+                df = pd.read_parquet(path, engine='pyarrow')
+                self.add_dataframe(df, filename)
+        elif path.endswith((".arrow", ".feather")):
+            filename = os.path.splitext(os.path.split(path)[1])[0]
+            self.add_dataframe(PandasGuiArrowStore.from_file(path), filename)
         elif path.endswith(".json"):
             filename = os.path.split(path)[1].split('.json')[0]
             with open(path) as f:
@@ -856,7 +2259,7 @@ class PandasGuiStore:
             df = pd.read_pickle(path)
             self.add_dataframe(df, filename)
         else:
-            logger.warning("Can only import csv / xlsx / parquet. Invalid file: " + path)
+            logger.warning("Can only import csv / xlsx / parquet / arrow / feather. Invalid file: " + path)
 
     def get_dataframes(self, names: Union[None, str, list, int] = None):
         if type(names) == str:
@@ -1,9 +1,11 @@
 import logging
+import numpy as np
 import pandas as pd
 from PyQt5 import QtWidgets
-from typing import List, Union
+from typing import List, Tuple, Union
 import sys
 import inspect
+import functools
 from collections import OrderedDict
 
 logger = logging.getLogger(__name__)
@@ -172,6 +174,62 @@ def nunique(df):
     return pd.Series(results)
 
 
+# 64 bit hashes of the values of s, which must have no missing values. Object values use their Python hash, which is
+# cached by strings, and the string of unhashable items
+def hash_values(s: pd.Series) -> np.ndarray:
+    if s.dtype != object:
+        return pd.util.hash_pandas_object(s, index=False, categorize=False).to_numpy()
+    values = s.to_numpy()
+    try:
+        hashes = np.fromiter(map(hash, values), dtype=np.int64, count=len(values)).view(np.uint64)
+    except TypeError:
+        hashes = np.fromiter((hash(str(value)) for value in values), dtype=np.int64, count=len(values)).view(np.uint64)
+    # Mix the bits with the splitmix64 finalizer, the hash of an integer is the integer itself
+    with np.errstate(over='ignore'):
+        hashes = (hashes ^ (hashes >> np.uint64(30))) * np.uint64(0xbf58476d1ce4e5b9)
+        hashes = (hashes ^ (hashes >> np.uint64(27))) * np.uint64(0x94d049bb133111eb)
+    return hashes ^ (hashes >> np.uint64(31))
+
+
+# Estimate of s.nunique() using HyperLogLog, for columns too large to count exactly. Values are hashed a chunk at a time
+# so memory doesn't grow with the number of unique values. The standard error is about 1.04 / sqrt(2 ** precision),
+# under 1% with the default precision
+def approximate_nunique(s: pd.Series, precision=14, chunk_size=1_000_000) -> int:
+    m = 1 << precision
+    registers = np.zeros(m, dtype=np.uint8)
+    for start in range(0, len(s), chunk_size):
+        chunk = s.iloc[start:start + chunk_size].dropna()
+        if len(chunk) == 0:
+            continue
+        hashes = hash_values(chunk)
+        # The first bits of each hash pick a register, which keeps the longest run of leading zeros in the rest
+        buckets = (hashes >> np.uint64(64 - precision)).astype(np.intp)
+        rest = hashes & np.uint64((1 << (64 - precision)) - 1)
+        # The rest fits in a float64 exactly, so frexp gives its bit length
+        _, bit_length = np.frexp(rest.astype(np.float64))
+        np.maximum.at(registers, buckets, (64 - precision + 1 - bit_length).astype(np.uint8))
+
+    estimate = 0.7213 / (1 + 1.079 / m) * m ** 2 / np.sum(np.ldexp(1.0, -registers.astype(int)))
+    # Small counts are estimated better from the number of empty registers
+    empty = np.count_nonzero(registers == 0)
+    if estimate <= 2.5 * m and empty:
+        estimate = m * np.log(m / empty)
+    return int(round(estimate))
+
+
+# Min and max of a random sample of s, for object columns too large to compare every value. NaN when the values can't
+# be compared, like mixed types
+def sample_min_max(s: pd.Series, size=100_000, seed=0) -> tuple:
+    if len(s) > size:
+        positions = np.random.default_rng(seed).choice(len(s), size, replace=False)
+        s = s.iloc[np.sort(positions)]
+    s = s.dropna()
+    try:
+        return (s.min(), s.max()) if len(s) else (np.nan, np.nan)
+    except TypeError:
+        return np.nan, np.nan
+
+
 # Alternative to series.unique that works when it contains unhashable items
 def unique(s):
     try:
@@ -180,6 +238,23 @@ def unique(s):
         return s.astype(str).unique()
 
 
+# Whether a dtype is for pyarrow data (see PandasGuiArrowStore) instead of numpy arrays
+def is_arrow_dtype(dtype):
+    return isinstance(dtype, getattr(pd, 'ArrowDtype', ()))
+
+
+# Convert an arrow backed Series to the equivalent numpy backed one, since some of pandas doesn't support ArrowDtype
+# yet (eg. to_numpy with a NaN na_value). Only call this on the slice that is needed, as it copies the data into memory
+def to_numpy_backed(s: pd.Series):
+    if not is_arrow_dtype(s.dtype):
+        return s
+    import pyarrow as pa
+    converted = pa.array(s.array).to_pandas()
+    converted.index = s.index
+    converted.name = s.name
+    return converted
+
+
 def traverse_tree_widget(tree: Union[QtWidgets.QTreeWidget, QtWidgets.QTreeWidgetItem]) -> List[
     QtWidgets.QTreeWidgetItem]:
     if issubclass(type(tree), QtWidgets.QTreeWidget):
@@ -206,6 +281,11 @@ def clear_layout(layout):
                 clear_layout(child.layout())
 
 
+# Whether any part of a widget is on screen. Widgets in tabbed docks that aren't selected are still isVisible
+def is_shown(widget: QtWidgets.QWidget):
+    return widget.isVisible() and not widget.visibleRegion().isEmpty()
+
+
 def unique_name(name, existing_names):
     if name in existing_names:
         for i in range(2, 999):
@@ -410,6 +490,64 @@ def get_week_str(ts):
     return "{}W{:02}".format(year, week)
 
 
+# Node types that make an expression elementwise, so its result for each row only depends on the values in that row
+ELEMENTWISE_NODES = ('Expression', 'BoolOp', 'BinOp', 'UnaryOp', 'Compare', 'Name', 'Load', 'Constant', 'List', 'Tuple',
+                     'boolop', 'operator', 'unaryop', 'cmpop')
+# Series methods and accessors that work on each value separately, like a.str.contains('x') or a.isin([1, 2]), when
+# their arguments don't use any columns. str.cat joins all the values into one string when it has no arguments
+ELEMENTWISE_METHODS = ('isin', 'isna', 'isnull', 'notna', 'notnull', 'between', 'abs', 'round', 'astype')
+ELEMENTWISE_ACCESSORS = ('str', 'dt')
+
+
+# Parse a DataFrame.query expression. Returns the set of variable names it uses (columns or index levels) and whether
+# it is elementwise, or (None, False) if it can't be parsed as Python (eg. if it uses @local_variables)
+@functools.lru_cache(maxsize=256)
+def parse_query_expr(expr: str):
+    import ast
+    import re
+
+    # Names quoted in backticks can have spaces and other characters, so replace them with valid identifiers
+    quoted = []
+
+    def replace_quoted(match):
+        quoted.append(match.group(1))
+        return f"__quoted_{len(quoted) - 1}"
+
+    try:
+        tree = ast.parse(re.sub(r'`([^`]*)`', replace_quoted, expr).strip(), mode='eval')
+    except SyntaxError:
+        return None, False
+
+    def is_elementwise_attribute(node):
+        if node.attr in ELEMENTWISE_ACCESSORS or node.attr in ELEMENTWISE_METHODS:
+            return True
+        return (isinstance(node.value, ast.Attribute) and node.value.attr in ELEMENTWISE_ACCESSORS
+                and node.attr != 'cat')
+
+    def is_elementwise_call(node):
+        arguments = node.args + [keyword.value for keyword in node.keywords]
+        return isinstance(node.func, ast.Attribute) and not any(
+            isinstance(child, ast.Name) for argument in arguments for child in ast.walk(argument))
+
+    elementwise_types = tuple(getattr(ast, name) for name in ELEMENTWISE_NODES)
+    names = set()
+    elementwise = True
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            if node.id.startswith('__quoted_'):
+                names.add(quoted[int(node.id[len('__quoted_'):])])
+            else:
+                names.add(node.id)
+        if isinstance(node, ast.Attribute):
+            elementwise = elementwise and is_elementwise_attribute(node)
+        elif isinstance(node, ast.Call):
+            elementwise = elementwise and is_elementwise_call(node)
+        elif not isinstance(node, elementwise_types + (ast.keyword,)):
+            elementwise = False
+
+    return frozenset(names), elementwise
+
+
 # Rename a variable in a Python expression
 def refactor_variable(expr, old_name, new_name):
     import ast
@@ -461,26 +599,120 @@ def get_figure_type(fig):
     return None
 
 
-# Take the text entered for a DataFrame cell and parse it into an appropriate type for the column
-def parse_cell(text, column_dtype):
-    import numpy as np
-    if text == "":
-        return np.nan
+# Parser that converts the text entered for a cell into a value for a column of the given dtype. These are built once
+# per dtype, so editing a cell doesn't have to go through pd.read_csv. Raises ValueError if the text can't be converted
+@functools.lru_cache(maxsize=64)
+def get_cell_parser(dtype):
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype) and not isinstance(dtype, pd.CategoricalDtype):
+        missing = dtype.na_value
+    elif pd.api.types.is_datetime64_any_dtype(dtype) or pd.api.types.is_timedelta64_dtype(dtype):
+        missing = pd.NaT
+    else:
+        missing = np.nan
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        parse_category = get_cell_parser(dtype.categories.dtype)
+
+        def parse(text):
+            return text if text in dtype.categories else parse_category(text)
+    elif pd.api.types.is_bool_dtype(dtype):
+        values = {'true': True, '1': True, 'false': False, '0': False}
+
+        def parse(text):
+            return values[text.strip().lower()]
+    elif pd.api.types.is_integer_dtype(dtype):
+        info = np.iinfo(dtype.type)
 
-    if column_dtype == str:
-        return text
+        def parse(text):
+            try:
+                value = int(text)
+            except ValueError:
+                # Allow whole numbers written like 1.0 or 1e3
+                value = float(text)
+                if not value.is_integer():
+                    raise
+                value = int(value)
+            if not info.min <= value <= info.max:
+                raise ValueError
+            return dtype.type(value)
+    elif pd.api.types.is_float_dtype(dtype):
+        def parse(text):
+            return dtype.type(float(text))
+    elif pd.api.types.is_datetime64_any_dtype(dtype):
+        tz = getattr(dtype, 'tz', None)
+
+        def parse(text):
+            value = pd.Timestamp(text)
+            if tz is not None:
+                value = value.tz_localize(tz) if value.tz is None else value.tz_convert(tz)
+            return value
+    elif pd.api.types.is_timedelta64_dtype(dtype):
+        parse = pd.Timedelta
+    else:
+        def parse(text):
+            return text
 
-    # Parse text using same logic as reading a CSV file by using a file buffer
+    def parse_cell(text: str):
+        if text == "":
+            return missing
+        try:
+            return parse(text)
+        except (ValueError, TypeError, KeyError, OverflowError):
+            raise ValueError(f"Could not convert {repr(text)} to type {dtype}")
+
+    return parse_cell
+
+
+# Convert values to dtype if that doesn't change any of them, like 1.0 to an int column but not 1.5. Text is parsed,
+# like dates to a datetime column. values are returned unchanged if they can't be converted
+def coerce_to_dtype(values: pd.Series, dtype) -> pd.Series:
+    if values.dtype == dtype:
+        return values
+    # Numbers could otherwise be read as timestamps and the like
+    if not pd.api.types.is_object_dtype(values) and not (pd.api.types.is_numeric_dtype(values)
+                                                         and pd.api.types.is_numeric_dtype(dtype)):
+        return values
+    if pd.api.types.is_object_dtype(values):
+        # Each value is parsed like text typed into a cell, since astype would make any text True in a bool column and
+        # truncate 1.7 in an int column
+        parse = get_cell_parser(pd.api.types.pandas_dtype(dtype))
+        try:
+            parsed = [value if missing else parse(value if isinstance(value, str) else str(value))
+                      for value, missing in zip(values, values.isna())]
+        except ValueError:
+            return values
+        values_to_convert = pd.Series(parsed, index=values.index, name=values.name, dtype=object)
+    else:
+        values_to_convert = values
     try:
-        from io import StringIO
-        import pandas as pd
-        value = pd.read_csv(StringIO(text), dtype=column_dtype, header=None).values[0][0]
-        return value
-    except ValueError:
-        raise ValueError(f"Could not convert {repr(text)} to type {column_dtype}")
+        coerced = values_to_convert.astype(dtype)
+    except (ValueError, TypeError, OverflowError):
+        return values
+    if not pd.api.types.is_object_dtype(values) and not coerced.astype(values.dtype).equals(values):
+        return values
+    # Like missing values written to an int column, which would otherwise be filled in
+    if (coerced.isna() != values_to_convert.isna()).any():
+        return values
+    return coerced
+
+
+# Whether writing values into a column of dtype leaves the dtype unchanged. May be False when it would be unchanged
+def keeps_dtype(values: pd.Series, dtype) -> bool:
+    if values.dtype == dtype or pd.api.types.is_object_dtype(dtype):
+        return True
+    missing = values.isna()
+    if isinstance(dtype, pd.CategoricalDtype):
+        return bool((missing | values.isin(dtype.categories)).all())
+    if missing.all():
+        # Missing values make numpy int and bool columns float or object
+        return isinstance(dtype, pd.api.extensions.ExtensionDtype) or not (
+                pd.api.types.is_integer_dtype(dtype) or pd.api.types.is_bool_dtype(dtype))
+    return False
 
 
-value = parse_cell('nan', str)
+# Take the text entered for a DataFrame cell and parse it into an appropriate type for the column
+def parse_cell(text, column_dtype):
+    return get_cell_parser(pd.api.types.pandas_dtype(column_dtype))(text)
 
 
 def summarize_json(data, terse=True):
@@ -548,6 +780,63 @@ def get_movements(a: list, b: list):
     return movements
 
 
+# Turn a stable sort order into the stable order for sorting the other way, in linear time instead of sorting again.
+# values are the arrays that were sorted on, already taken in the order of order, and the first valid rows of order are
+# the ones without missing values, which stay last. Runs of equal values are reversed as blocks so the rows in each run
+# keep their order, like sort_values(kind='mergesort')
+def reverse_sort_order(order: np.ndarray, values: list, valid: int) -> np.ndarray:
+    if valid < 2:
+        return order.copy()
+    changed = np.zeros(valid - 1, dtype=bool)
+    for array in values:
+        changed |= np.asarray(array[1:valid] != array[:valid - 1], dtype=bool)
+    starts = np.flatnonzero(np.concatenate([[True], changed]))
+    lengths = np.diff(np.append(starts, valid))
+
+    starts, lengths = starts[::-1], lengths[::-1]
+    offsets = np.cumsum(lengths) - lengths
+    source = np.arange(valid) + np.repeat(starts - offsets, lengths)
+    return np.concatenate([order[:valid][source], order[valid:]])
+
+
+# Numeric array whose stable ascending order is the order of sort_values(kind='mergesort') on s, with missing values
+# last, for np.argsort and np.lexsort. Strings and other objects are factorized into sorted codes, categoricals use
+# their codes and datetimes their int64 values. Returns the key and a boolean array of the missing values
+def get_sort_key(s: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    dtype = s.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        key = s.cat.codes.to_numpy().astype(np.int64)
+        missing = key == -1
+        key[missing] = len(dtype.categories)
+    elif isinstance(dtype, pd.DatetimeTZDtype) or (isinstance(dtype, np.dtype) and dtype.kind in 'mM'):
+        # Arrow backed datetimes don't have asi8 and are factorized below
+        key = s.array.asi8.copy()
+        missing = s.isna().to_numpy()
+        key[missing] = np.iinfo(np.int64).max
+    elif isinstance(dtype, np.dtype) and dtype.kind in 'biuf':
+        key = s.to_numpy()
+        if dtype.kind == 'b':
+            key = key.view(np.int8)
+        missing = np.isnan(key) if dtype.kind == 'f' else np.zeros(len(key), dtype=bool)
+    else:
+        key, uniques = pd.factorize(s, sort=True)
+        key = key.astype(np.int64)
+        missing = key == -1
+        key[missing] = len(uniques)
+    return key, missing
+
+
+# Key that sorts the other way from a get_sort_key, with missing values still last and equal values still equal
+def reverse_sort_key(key: np.ndarray, missing: np.ndarray) -> np.ndarray:
+    if key.dtype.kind == 'f':
+        # NaN stays last
+        return -key
+    # ~ reverses the order of integers without overflowing
+    reversed_key = ~key
+    reversed_key[missing] = key[missing]
+    return reversed_key
+
+
 event_lookup = {"0": "QEvent::None",
                 "114": "QEvent::ActionAdded",
                 "113": "QEvent::ActionChanged",
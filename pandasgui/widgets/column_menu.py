@@ -26,21 +26,25 @@ class ColumnMenu(QtWidgets.QMenu):
         # Sorting
 
         def select_button():
-            self.sort_b1.setDown(self.pgdf.sort_state == 'Asc' and self.pgdf.sorted_column_ix == column_ix)
-            self.sort_b2.setDown(self.pgdf.sort_state == 'Desc' and self.pgdf.sorted_column_ix == column_ix)
-            self.sort_b3.setDown(self.pgdf.sort_state == 'None' or self.pgdf.sorted_column_ix != column_ix)
+            sort_state = self.pgdf.get_column_sort_state(column_ix)
+            self.sort_b1.setDown(sort_state == 'Asc')
+            self.sort_b2.setDown(sort_state == 'Desc')
+            self.sort_b3.setDown(sort_state == 'None')
+
+        # A column that is a secondary sort key keeps its place among the keys
+        def sort(sort_state):
+            self.pgdf.sort_column(self.column_ix, sort_state,
+                                  append=self.pgdf.get_column_sort_state(self.column_ix) != 'None')
+            select_button()
 
         self.sort_b1 = QtWidgets.QPushButton("Asc")
-        self.sort_b1.clicked.connect(lambda: [self.pgdf.sort_column(self.column_ix, "Asc"),
-                                              select_button()])
+        self.sort_b1.clicked.connect(lambda: sort("Asc"))
 
         self.sort_b2 = QtWidgets.QPushButton("Desc")
-        self.sort_b2.clicked.connect(lambda: [self.pgdf.sort_column(self.column_ix, "Desc"),
-                                              select_button()])
+        self.sort_b2.clicked.connect(lambda: sort("Desc"))
 
         self.sort_b3 = QtWidgets.QPushButton("None")
-        self.sort_b3.clicked.connect(lambda: [self.pgdf.sort_column(self.column_ix, "None"),
-                                              select_button()])
+        self.sort_b3.clicked.connect(lambda: sort("None"))
 
         select_button()
 
@@ -56,7 +60,7 @@ class ColumnMenu(QtWidgets.QMenu):
         ########################
         # Move
 
-        col_name = self.pgdf.df.columns[column_ix]
+        col_name = self.pgdf.df_unfiltered.columns[column_ix]
         self.move_b1 = QtWidgets.QPushButton("<<")
         self.move_b1.clicked.connect(lambda: [self.pgdf.move_column(column_ix, 0),
                                               self.close(), self.pgdf.dataframe_viewer.show_column_menu(col_name)])
@@ -93,6 +97,14 @@ class ColumnMenu(QtWidgets.QMenu):
         button.clicked.connect(lambda: [self.pgdf.parse_date(column_ix), self.close()])
         self.add_widget(button)
 
+        ########################
+        # Statistics
+        statistics = self.pgdf.statistics_cache.get(self.pgdf.get_statistics_cache_key(column_ix))
+        if statistics is not None and statistics.estimates:
+            button = QtWidgets.QPushButton("Compute Exact Statistics")
+            button.clicked.connect(lambda: [self.pgdf.compute_exact_statistics(column_ix), self.close()])
+            self.add_widget(button)
+
         ########################
         # Data Type
         col_type = self.pgdf.df_unfiltered.dtypes[column_ix]
@@ -106,23 +118,19 @@ class ColumnMenu(QtWidgets.QMenu):
         ########################
         # Coloring
         self.add_action("Color by None",
-                        lambda: [setattr(self.pgdf.dataframe_viewer, 'color_mode', None),
-                                 self.pgdf.dataframe_viewer.refresh_ui()]
+                        lambda: self.pgdf.dataframe_viewer.set_color_mode(None)
                         )
 
         self.add_action("Color by columns",
-                        lambda: [setattr(self.pgdf.dataframe_viewer, 'color_mode', 'column'),
-                                 self.pgdf.dataframe_viewer.refresh_ui()]
+                        lambda: self.pgdf.dataframe_viewer.set_color_mode('column')
                         )
 
         self.add_action("Color by rows",
-                        lambda: [setattr(self.pgdf.dataframe_viewer, 'color_mode', 'row'),
-                                 self.pgdf.dataframe_viewer.refresh_ui()]
+                        lambda: self.pgdf.dataframe_viewer.set_color_mode('row')
                         )
 
         self.add_action("Color by all",
-                        lambda: [setattr(self.pgdf.dataframe_viewer, 'color_mode', 'all'),
-                                 self.pgdf.dataframe_viewer.refresh_ui()]
+                        lambda: self.pgdf.dataframe_viewer.set_color_mode('all')
                         )
 
     def add_action(self, text, function):
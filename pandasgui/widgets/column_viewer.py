@@ -4,18 +4,21 @@ from PyQt5 import QtWidgets, QtGui, QtCore
 from PyQt5.QtCore import Qt, pyqtSignal
 from PyQt5.QtGui import QMouseEvent
 
-from pandasgui.store import PandasGuiDataFrameStore
+from pandasgui.store import PandasGuiDataFrameStore, DataChange
 from pandasgui.utility import nunique
 from pandasgui.widgets import base_widgets
 
 
 class FlatDraggableTree(base_widgets.QTreeWidget):
     mouseReleaseEventSignal = pyqtSignal(QMouseEvent)
+    item_flags = Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsDragEnabled & ~Qt.ItemIsDropEnabled
 
     def __init__(self):
         super().__init__()
 
         self.header().setStretchLastSection(False)
+        # Only measure visible items when resizing columns to their contents, so it doesn't depend on the column count
+        self.header().setResizeContentsPrecision(0)
         self.setDragDropMode(self.InternalMove)
         self.setSelectionMode(self.ExtendedSelection)
         self.setSelectionBehavior(self.SelectRows)
@@ -48,11 +51,14 @@ class FlatDraggableTree(base_widgets.QTreeWidget):
         root = self.invisibleRootItem()
         root.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsDropEnabled)
 
+        # Only change items that need it, each change to an item in the tree notifies the view
         for i in range(root.childCount()):
             child = root.child(i)
-            child.setExpanded(True)
+            if child.childCount() > 0 and not child.isExpanded():
+                child.setExpanded(True)
 
-            child.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsDragEnabled & ~Qt.ItemIsDropEnabled)
+            if child.flags() != self.item_flags:
+                child.setFlags(self.item_flags)
 
     def mimeData(self, indexes):
         mimedata = super().mimeData(indexes)
@@ -65,6 +71,26 @@ class FlatDraggableTree(base_widgets.QTreeWidget):
         super().mouseReleaseEvent(event)
 
 
+class ColumnItem(base_widgets.QTreeWidgetItem):
+    """
+    Tree item for a DataFrame column showing its name, number of unique values and type.
+    The number of unique values is only counted once the item is shown, since it is slow for wide DataFrames
+    """
+
+    def __init__(self, pgdf: PandasGuiDataFrameStore, column, column_type: str):
+        super().__init__([str(column), "", column_type])
+        self.pgdf = pgdf
+        self.column = column
+        self.column_nunique = None
+
+    def data(self, column, role):
+        if column == 1 and role in [Qt.DisplayRole, Qt.EditRole]:
+            if self.column_nunique is None:
+                self.column_nunique = str(nunique(self.pgdf.df_unfiltered[self.column].to_frame()).iloc[0])
+            return self.column_nunique
+        return super().data(column, role)
+
+
 class ColumnViewer(QtWidgets.QWidget):
     def __init__(self, pgdf: PandasGuiDataFrameStore):
         super().__init__()
@@ -83,43 +109,84 @@ class ColumnViewer(QtWidgets.QWidget):
         self.source_tree_layout.addWidget(self.tree)
         self.setLayout(self.source_tree_layout)
 
+        # Set when columns are added, removed or moved while this is hidden, so the list is remade when it's shown
+        self.outdated = False
+        self.pgdf = None
         self.update_df(pgdf)
 
     def update_df(self, df):
         pgdf = PandasGuiDataFrameStore.cast(df)
+        if pgdf is not self.pgdf:
+            pgdf.change_bus.subscribe(lambda change: self.on_data_changed(pgdf, change))
 
         self.pgdf = pgdf
         self.refresh()
 
+    def on_data_changed(self, pgdf: PandasGuiDataFrameStore, change: DataChange):
+        # Ignore DataFrames this was showing before update_df
+        if pgdf is not self.pgdf:
+            return
+
+        if change.kinds & {'reset', 'column_removed', 'columns_moved'}:
+            if self.isVisible():
+                self.refresh()
+            else:
+                self.outdated = True
+        elif 'cells' in change.kinds and not self.outdated:
+            # Values or types of some columns changed, the unique counts are counted again when next shown
+            dtypes = self.pgdf.df_unfiltered.dtypes
+            if change.columns is not None:
+                dtypes = dtypes.iloc[change.columns]
+            # Items may be sorted, so find them by name
+            for i in range(self.tree.topLevelItemCount()):
+                item = self.tree.topLevelItem(i)
+                if item.column in dtypes.index:
+                    item.column_nunique = None
+                    if item.text(2) != str(dtypes[item.column]):
+                        item.setText(2, str(dtypes[item.column]))
+
+    def showEvent(self, event: QtGui.QShowEvent):
+        if self.outdated:
+            self.refresh()
+        super().showEvent(event)
+
     def refresh(self):
+        self.outdated = False
         sources = self.pgdf.df_unfiltered.columns
-        source_nunique = nunique(self.pgdf.df_unfiltered)
-        source_types = self.pgdf.df_unfiltered.dtypes.values.astype(str)
+        # Convert each distinct dtype to a string once, converting every column's dtype is slow for wide DataFrames
+        dtypes = self.pgdf.df_unfiltered.dtypes.values
+        type_names = {dtype: str(dtype) for dtype in set(dtypes)}
+        source_types = [type_names[dtype] for dtype in dtypes]
 
         # Ensure no duplicates
         assert (len(sources) == len(set(sources)))
-        assert (len(sources) == len(source_nunique))
         assert (len(sources) == len(source_types))
 
+        # Add all items in one insertion, each insertion expands the whole tree
+        items = [ColumnItem(self.pgdf, sources[i], source_types[i]) for i in range(len(sources))]
+        for item in items:
+            item.setFlags(self.tree.item_flags)
         self.tree.clear()
-        for i in range(len(sources)):
-            item = base_widgets.QTreeWidgetItem(self.tree,
-                                                [str(sources[i]), str(source_nunique[i]), str(source_types[i])])
+        self.tree.addTopLevelItems(items)
 
         # Depends on Search Box and Source list
         self.filter()
         self.tree.apply_tree_settings()
 
     def filter(self):
+        if self.search_bar.text() == "":
+            matches = None
+        else:
+            matches = set(id(item) for item in self.tree.findItems(f".*{self.search_bar.text()}.*",
+                                                                   Qt.MatchRegExp | Qt.MatchRecursive))
+
+        # Only change items whose visibility changed, hiding items is slow for wide DataFrames
         root = self.tree.invisibleRootItem()
         for i in range(root.childCount()):
             child = root.child(i)
-            child.setHidden(True)
-
-        items = self.tree.findItems(f".*{self.search_bar.text()}.*",
-                                    Qt.MatchRegExp | Qt.MatchRecursive)
-        for item in items:
-            item.setHidden(False)
+            hidden = matches is not None and id(child) not in matches
+            if child.isHidden() != hidden:
+                child.setHidden(hidden)
 
 
 class SortableColumnViewer(ColumnViewer):
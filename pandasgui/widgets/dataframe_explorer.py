@@ -54,6 +54,10 @@ class DataFrameExplorer(QtWidgets.QWidget):
         self.grapher_dock.activated.connect(lambda: set_active_tab("Grapher"))
         self.reshaper_dock.activated.connect(lambda: set_active_tab("Reshaper"))
 
+        # Views skip refreshing while their tab isn't selected
+        self.statistics_dock.activated.connect(self.statistics_viewer.refresh_if_outdated)
+        self.grapher_dock.activated.connect(self.grapher.replot_if_outdated)
+
         self.dataframe_viewer.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Expanding)
 
         ##################
@@ -116,7 +120,6 @@ class ColumnArranger(ColumnViewer):
         self.tree.setDragEnabled(True)
         self.tree.setDefaultDropAction(Qt.MoveAction)
         self.tree.setHeaderLabels(['Name'])
-        self.refresh()
 
         self.setContextMenuPolicy(Qt.CustomContextMenu)
 
@@ -1,19 +1,22 @@
 import sys
 import threading
 import os
-from typing import Union
+from collections import OrderedDict
+from typing import List, Union
 
 import numpy as np
 import pandas as pd
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtCore import Qt
 from typing_extensions import Literal
-from pandasgui.store import PandasGuiDataFrameStore
+from pandasgui.store import PandasGuiDataFrameStore, DataChange
+from pandasgui.utility import is_arrow_dtype, to_numpy_backed
 import pandasgui
 
 import logging
 
 from pandasgui.widgets.column_menu import ColumnMenu
+from pandasgui.widgets.spinner import Spinner
 
 logger = logging.getLogger(__name__)
 
@@ -29,9 +32,16 @@ class DataFrameViewer(QtWidgets.QWidget):
         # Local state
         # How to color cells
         self.color_mode: Literal[None, 'column', 'row', 'all'] = None
+        # Number of rows to show when rows are added progressively as the table is scrolled (see
+        # settings.progressive_rows), or None to show all rows
+        self.row_limit = pgdf.settings.progressive_rows.value or None
+        # The pgdf.row_ids of the rows currently shown, used to work out how rows changed on refresh
+        self.row_ids = pgdf.filtered_row_ids[:self.shown_row_count()]
 
         # Set up DataFrame TableView and Model
         self.dataView = DataTableView(parent=self)
+        # Shown over the table while filters are evaluated in the background
+        self.spinner = Spinner(centerOnParent=True, disableParentWhenSpinning=False, parent=self.dataView)
 
         # Create headers
         self.columnHeader = HeaderView(parent=self, orientation=Qt.Horizontal)
@@ -101,9 +111,15 @@ class DataFrameViewer(QtWidgets.QWidget):
         self.indexHeader.verticalHeader().setDefaultSectionSize(default_row_height)
         self.dataView.verticalHeader().setDefaultSectionSize(default_row_height)
 
-        # Set column widths
-        for column_index in range(self.columnHeader.model().columnCount()):
-            self.auto_size_column(column_index)
+        # Set column widths. Columns are sized as they scroll into view, and the rest in the background once the event
+        # loop is running so large DataFrames don't delay showing the viewer
+        self.columns_sized = [False] * self.columnHeader.model().columnCount()
+        self.auto_size_timer = QtCore.QTimer(self)
+        self.auto_size_timer.setInterval(0)
+        self.auto_size_timer.timeout.connect(self.auto_size_next_columns)
+        self.dataView.horizontalScrollBar().valueChanged.connect(self.auto_size_visible_columns)
+        self.auto_size_visible_columns()
+        self.auto_size_timer.start()
 
     def set_styles(self):
         for item in [self.dataView, self.columnHeader, self.indexHeader, self.indexHeaderNames, self.columnHeaderNames]:
@@ -121,20 +137,20 @@ class DataFrameViewer(QtWidgets.QWidget):
 
         width = 0
 
-        # Iterate over the data view rows and check the width of each to determine the max width for the column
-        # Only check the first N rows for performance. If there is larger content in cells below it will be cut off
-        N = 100
-        for i in range(self.dataView.model().rowCount())[:N]:
-            mi = self.dataView.model().index(i, column_index)
-            text = self.dataView.model().data(mi)
-            w = self.dataView.fontMetrics().boundingRect(text).width()
-            width = max(width, w)
+        # Check a sample of rows spread over the whole column, so long values further down are accounted for.
+        # Only the longest strings are measured since their lengths mostly determine the width
+        sample = stratified_sample(len(self.pgdf.filtered_index_map), 1000)
+        texts = format_cells(self.pgdf.filtered_iloc(sample, column_index))[0]
+        if len(texts) > 0:
+            lengths = np.char.str_len(np.array(texts, dtype=str))
+            for i in np.argsort(lengths)[-10:]:
+                width = max(width, text_width(self.dataView.font(), texts[i]))
 
         # Repeat for header cells
         for i in range(self.columnHeader.model().rowCount()):
             mi = self.columnHeader.model().index(i, column_index)
             text = self.columnHeader.model().data(mi)
-            w = self.columnHeader.fontMetrics().boundingRect(text).width()
+            w = text_width(self.columnHeader.font(), text)
             width = max(width, w)
 
         padding = 30
@@ -146,10 +162,42 @@ class DataFrameViewer(QtWidgets.QWidget):
 
         self.columnHeader.setColumnWidth(column_index, width)
         self.dataView.setColumnWidth(column_index, width)
+        self.columns_sized[column_index] = True
 
         self.dataView.updateGeometry()
         self.columnHeader.updateGeometry()
 
+    def auto_size_visible_columns(self):
+        """
+        Size the columns currently in view that haven't been sized yet
+        """
+        if self.dataView.isVisible():
+            right = self.dataView.viewport().width()
+        else:
+            # Size isn't known until the viewer is shown, so assume it may fill the screen
+            right = QtWidgets.QApplication.primaryScreen().availableGeometry().width()
+
+        column_index = max(self.dataView.columnAt(0), 0)
+        while column_index < len(self.columns_sized) \
+                and self.dataView.columnViewportPosition(column_index) < right:
+            if not self.columns_sized[column_index]:
+                self.auto_size_column(column_index)
+            column_index += 1
+
+    def auto_size_next_columns(self, count=20):
+        """
+        Size the next few columns that haven't been sized yet, stopping the background sizing when all are done
+        """
+        for _ in range(count):
+            if False not in self.columns_sized:
+                self.auto_size_timer.stop()
+                return
+            self.auto_size_column(self.columns_sized.index(False))
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.auto_size_visible_columns()
+
     def auto_size_row(self, row_index):
         """
         Set the size of row at row_index to fix its contents
@@ -203,6 +251,10 @@ class DataFrameViewer(QtWidgets.QWidget):
             self.copy(header=True)
         if event.matches(QtGui.QKeySequence.Paste):
             self.paste()
+        if event.matches(QtGui.QKeySequence.Undo):
+            self.pgdf.undo()
+        if event.matches(QtGui.QKeySequence.Redo):
+            self.pgdf.redo()
         if event.key() == Qt.Key_P and (mods & Qt.ControlModifier):
             pass
         if event.key() == Qt.Key_D and (mods & Qt.ControlModifier):
@@ -220,16 +272,15 @@ class DataFrameViewer(QtWidgets.QWidget):
             rows = [ix.row() for ix in indexes]
             cols = [ix.column() for ix in indexes]
 
-            temp_df = self.pgdf.df
-            df = temp_df.iloc[min(rows): max(rows) + 1, min(cols): max(cols) + 1]
+            df = self.pgdf.filtered_iloc(slice(min(rows), max(rows) + 1), slice(min(cols), max(cols) + 1))
 
         elif self.indexHeader.hasFocus():
             indexes = self.indexHeader.selectionModel().selection().indexes()
             rows = [ix.row() for ix in indexes]
             cols = [ix.column() for ix in indexes]
 
-            temp_df = self.pgdf.df.index.to_frame()
-            df = temp_df.iloc[min(rows): max(rows) + 1, min(cols): max(cols) + 1]
+            index = self.pgdf.df_unfiltered.index[self.pgdf.filtered_index_map[min(rows): max(rows) + 1]]
+            df = index.to_frame().iloc[:, min(cols): max(cols) + 1]
 
         elif self.columnHeader.hasFocus():
             indexes = self.columnHeader.selectionModel().selection().indexes()
@@ -237,7 +288,7 @@ class DataFrameViewer(QtWidgets.QWidget):
             cols = [ix.column() for ix in indexes]
 
             # Column header should be horizontal so we transpose
-            temp_df = self.pgdf.df.columns.to_frame().transpose()
+            temp_df = self.pgdf.df_unfiltered.columns.to_frame().transpose()
             df = temp_df.iloc[min(rows): max(rows) + 1, min(cols): max(cols) + 1]
         else:
             return
@@ -262,25 +313,26 @@ class DataFrameViewer(QtWidgets.QWidget):
 
         self.pgdf.paste_data(min(rows), min(cols), df_to_paste)
 
-        # Select the range of cells that were pasted
-        self.dataView.selectionModel().clearSelection()
-        temp = self.dataView.selectionMode()
-        self.dataView.setSelectionMode(QtWidgets.QAbstractItemView.MultiSelection)
+        # Select the range of cells that were pasted, as far as it's shown
+        model = self.dataView.model()
+        bottom = min(min(rows) + df_to_paste.shape[0], model.rowCount()) - 1
+        right = min(min(cols) + df_to_paste.shape[1], model.columnCount()) - 1
+        selection = QtCore.QItemSelection(model.index(min(rows), min(cols)), model.index(bottom, right))
+        self.dataView.selectionModel().select(selection, QtCore.QItemSelectionModel.ClearAndSelect)
 
-        for i in range(df_to_paste.shape[0]):
-            for j in range(df_to_paste.shape[1]):
-                self.dataView.selectionModel().select(self.dataView.model().index(min(rows) + i, min(cols) + j),
-                                                      QtCore.QItemSelectionModel.Select)
-
-        self.dataView.setSelectionMode(temp)
+    def set_color_mode(self, color_mode: Literal[None, 'column', 'row', 'all']):
+        self.color_mode = color_mode
+        model = self.dataView.model()
+        model.dataChanged.emit(model.index(0, 0), model.index(model.rowCount() - 1, model.columnCount() - 1),
+                               [QtCore.Qt.BackgroundRole])
 
     def show_column_menu(self, column_ix_or_name: Union[str, int]):
-        if isinstance(self.pgdf.df.columns, pd.MultiIndex):
+        if isinstance(self.pgdf.df_unfiltered.columns, pd.MultiIndex):
             logger.info("Column menu not implemented for MultiIndex")
             return
 
         if type(column_ix_or_name) == str:
-            column_ix = list(self.pgdf.df.columns).index(column_ix_or_name)
+            column_ix = list(self.pgdf.df_unfiltered.columns).index(column_ix_or_name)
         else:
             column_ix = column_ix_or_name
 
@@ -295,22 +347,170 @@ class DataFrameViewer(QtWidgets.QWidget):
         for model in [self.dataView.model(), self.columnHeader.model()]:
             parent = QtCore.QModelIndex()
             model.beginRemoveColumns(parent, ix, ix)
+            model.shape = (model.shape[0], model.shape[1] - 1)
             model.endRemoveColumns()
+        del self.columns_sized[ix]
 
     def _move_column(self, ix, new_ix, refresh=True):
+        # Moving past the end moves to the last position, same as list.insert
+        new_ix = min(new_ix, self.dataView.model().columnCount() - 1)
+        if new_ix == ix:
+            return
+
+        parent = QtCore.QModelIndex()
+        # beginMoveColumns takes the position the column is inserted before, counted before the column is removed
+        destination = new_ix + 1 if new_ix > ix else new_ix
         for view in [self.dataView, self.columnHeader]:
             model = view.model()
             column_widths = [view.columnWidth(ix) for ix in range(model.columnCount())]
             column_widths.insert(new_ix, column_widths.pop(ix))
 
+            model.beginMoveColumns(parent, ix, ix, parent, destination)
+            model.endMoveColumns()
+
             # Set width of destination column to the width of the source column
             for j in range(len(column_widths)):
                 view.setColumnWidth(j, column_widths[j])
+        self.columns_sized.insert(new_ix, self.columns_sized.pop(ix))
 
         if refresh:
             self.refresh_ui()
 
-    def refresh_ui(self):
+    def shown_row_count(self):
+        """
+        Number of rows of pgdf.df shown, which is less than all of them until they are fetched when rows are added
+        progressively
+        """
+        if self.row_limit is None:
+            return len(self.pgdf.filtered_index_map)
+        else:
+            return min(len(self.pgdf.filtered_index_map), self.row_limit)
+
+    def can_fetch_more(self):
+        return bool(self.dataView.model().rowCount() < len(self.pgdf.filtered_index_map))
+
+    def fetch_more(self):
+        """
+        Show the next batch of rows when rows are added progressively
+        """
+        start = self.dataView.model().rowCount()
+        self.row_limit = start + (self.pgdf.settings.progressive_rows.value or len(self.pgdf.filtered_index_map))
+        end = self.shown_row_count() - 1
+        if end >= start:
+            self.row_ids = self.pgdf.filtered_row_ids[:end + 1]
+            self._insert_rows(start, end)
+
+    def _remove_rows(self, start, end):
+        for model in [self.dataView.model(), self.indexHeader.model()]:
+            model.beginRemoveRows(QtCore.QModelIndex(), start, end)
+            model.shape = (model.shape[0] - (end - start + 1), model.shape[1])
+            model.endRemoveRows()
+
+    def _insert_rows(self, start, end):
+        for model in [self.dataView.model(), self.indexHeader.model()]:
+            model.beginInsertRows(QtCore.QModelIndex(), start, end)
+            model.shape = (model.shape[0] + (end - start + 1), model.shape[1])
+            model.endInsertRows()
+
+    # Update the rows shown by the views to match pgdf.df, keeping selections and row heights attached to the same rows
+    def _sync_rows(self):
+        old_ids = self.row_ids
+        new_ids = self.pgdf.filtered_row_ids[:self.shown_row_count()]
+        self.row_ids = new_ids
+        if np.array_equal(old_ids, new_ids):
+            return
+
+        id_count = max(old_ids.max(initial=-1), new_ids.max(initial=-1)) + 1
+        in_new = np.zeros(id_count, dtype=bool)
+        in_new[new_ids] = True
+        in_old = np.zeros(id_count, dtype=bool)
+        in_old[old_ids] = True
+        kept = in_new[old_ids]
+        added = ~in_old[new_ids]
+
+        # Rows were only removed, or only added, without reordering. Announce each contiguous run.
+        # Beyond a limit it is cheaper for the views to re-layout once than to process every run
+        max_runs = 100
+        if not added.any() and np.array_equal(old_ids[kept], new_ids):
+            runs = find_runs(~kept)
+            if len(runs) <= max_runs:
+                # Remove from the bottom up so earlier positions stay valid
+                for start, end in reversed(runs):
+                    self._remove_rows(start, end)
+                return
+        elif kept.all() and np.array_equal(new_ids[~added], old_ids):
+            runs = find_runs(added)
+            if len(runs) <= max_runs:
+                for start, end in runs:
+                    self._insert_rows(start, end)
+                return
+
+        # Rows were reordered, or too scattered to announce separately. Move persistent indexes to their new rows
+        new_row_by_id = np.full(id_count, -1)
+        new_row_by_id[new_ids] = np.arange(len(new_ids))
+        new_rows = new_row_by_id[old_ids]
+        for model in [self.dataView.model(), self.indexHeader.model()]:
+            model.layoutAboutToBeChanged.emit()
+            old_indexes = model.persistentIndexList()
+            new_indexes = []
+            for ix in old_indexes:
+                row = new_rows[ix.row()] if ix.row() < len(new_rows) else -1
+                new_indexes.append(model.createIndex(row, ix.column()) if row >= 0 else QtCore.QModelIndex())
+            model.shape = (len(new_ids), model.shape[1])
+            model.changePersistentIndexList(old_indexes, new_indexes)
+            model.layoutChanged.emit()
+
+    def refresh_ui(self, change: DataChange = None):
+        if change is None:
+            change = DataChange('reset')
+
+        if change.kind == 'column_removed':
+            for ix in change.columns:
+                self._remove_column(ix)
+        elif change.kind == 'columns_moved':
+            for src, dest in change.movements:
+                self._move_column(src, dest, refresh=False)
+
+        # Fall back to resetting if the structure can't be followed incrementally
+        if change.kind == 'reset' or self.dataView.model().shape[1] != self.pgdf.df_unfiltered.shape[1]:
+            self._reset_models()
+        else:
+            self._sync_rows()
+
+            model = self.dataView.model()
+            rows = None
+            if change.kind == 'cells' and change.rows is not None:
+                changed = np.zeros(len(self.pgdf.df_unfiltered), dtype=bool)
+                changed[change.rows] = True
+                rows = np.flatnonzero(changed[np.asarray(self.pgdf.filtered_index_map)])
+            model.update_caches(change, rows)
+
+            if change.kind == 'cells':
+                if rows is None:
+                    rows = [0, model.rowCount() - 1]
+                else:
+                    rows = rows[rows < model.rowCount()]
+                columns = [0, model.columnCount() - 1] if change.columns is None else change.columns
+                if len(rows) > 0 and len(columns) > 0:
+                    model.dataChanged.emit(model.index(min(rows), min(columns)),
+                                           model.index(max(rows), max(columns)))
+            # Merged changes (see ChangeBus) may also have filtered or sorted rows
+            if change.kinds != {'cells'}:
+                for view in [self.columnHeader, self.indexHeader]:
+                    view.set_spans()
+
+            # These models only hold the index and column level names
+            for model in [self.columnHeaderNames.model(), self.indexHeaderNames.model()]:
+                model.beginResetModel()
+                model.endResetModel()
+
+        # Update sizing
+        for view in [self.columnHeader,
+                     self.indexHeader,
+                     self.dataView]:
+            view.updateGeometry()
+
+    def _reset_models(self):
 
         # Update models
         self.models = []
@@ -323,18 +523,42 @@ class DataFrameViewer(QtWidgets.QWidget):
 
         for model in self.models:
             model.beginResetModel()
+            if isinstance(model, TrackedShapeModel):
+                model.shape = model.current_shape()
             model.endResetModel()
+        self.row_ids = self.pgdf.filtered_row_ids[:self.shown_row_count()]
+
+        # Size the columns again if they no longer line up with the old ones
+        if len(self.columns_sized) != self.dataView.model().columnCount():
+            self.columns_sized = [False] * self.dataView.model().columnCount()
+            self.auto_size_visible_columns()
+            self.auto_size_timer.start()
 
         # Update multi-index spans
         for view in [self.columnHeader,
                      self.indexHeader]:
             view.set_spans()
 
-        # Update sizing
-        for view in [self.columnHeader,
-                     self.indexHeader,
-                     self.dataView]:
-            view.updateGeometry()
+
+# Return the (starts, lengths) of each run of 2 or more equal adjacent codes. Missing values (code -1) are never grouped
+def find_spans(codes: np.ndarray):
+    if len(codes) < 2:
+        return np.array([], dtype=int), np.array([], dtype=int)
+
+    missing = codes == -1
+    breaks = (np.diff(codes) != 0) | missing[1:] | missing[:-1]
+    starts = np.concatenate([[0], np.flatnonzero(breaks) + 1])
+    lengths = np.diff(np.concatenate([starts, [len(codes)]]))
+    keep = lengths > 1
+    return starts[keep], lengths[keep]
+
+
+# Return the (start, end) positions of each run of True values in a boolean array, inclusive of end
+def find_runs(mask: np.ndarray):
+    padded = np.concatenate([[False], mask, [False]])
+    # Plain ints, since they end up in the model shapes returned to Qt
+    edges = np.flatnonzero(padded[1:] != padded[:-1]).tolist()
+    return list(zip(edges[::2], [edge - 1 for edge in edges[1::2]]))
 
 
 # Remove dotted border on cell focus.  https://stackoverflow.com/a/55252650/3620725
@@ -350,82 +574,330 @@ class NoFocusDelegate(QtWidgets.QStyledItemDelegate):
         super().paint(painter, item, ix)
 
 
-class DataTableModel(QtCore.QAbstractTableModel):
+# Sort indicator icons by sort state, loaded once on first use
+sort_icons = {}
+
+
+# Return the icon shown on the sorted column or index level, or None if not sorted
+def get_sort_icon(sort_state: Literal["Asc", "Desc", "None"]) -> Union[QtGui.QIcon, None]:
+    file_names = {"Asc": "sort-ascending.svg", "Desc": "sort-descending.svg"}
+    if sort_state not in file_names:
+        return None
+    if sort_state not in sort_icons:
+        sort_icons[sort_state] = QtGui.QIcon(os.path.join(pandasgui.__path__[0], "resources/images",
+                                                          file_names[sort_state]))
+    return sort_icons[sort_state]
+
+
+# Width in pixels of each character by font key, so text widths can be estimated without measuring every string
+glyph_widths = {}
+
+
+# Estimate the width of a single line of text in a font by adding up cached character widths
+def text_width(font: QtGui.QFont, text: str) -> int:
+    widths = glyph_widths.setdefault(font.key(), {})
+    metrics = None
+    width = 0
+    for char in text:
+        if char not in widths:
+            if metrics is None:
+                metrics = QtGui.QFontMetrics(font)
+            widths[char] = metrics.horizontalAdvance(char)
+        width += widths[char]
+    return width
+
+
+# Return the sorted positions of a sample of about sample_size rows out of row_count. Includes the first rows, since
+# they are shown first, and one random row from each of sample_size equal strata covering all rows
+def stratified_sample(row_count: int, sample_size: int, head: int = 100) -> np.ndarray:
+    if row_count <= sample_size:
+        return np.arange(row_count)
+
+    edges = np.linspace(0, row_count, sample_size + 1).astype(int)
+    rng = np.random.default_rng(0)
+    positions = edges[:-1] + (rng.random(sample_size) * np.diff(edges)).astype(int)
+    return np.union1d(np.arange(head), positions)
+
+
+# Background colors used for the heatmap when DataFrameViewer.color_mode is set, indexed by intensity
+HEATMAP_COLORS = [QtGui.QColor(255, 0, 0, alpha) for alpha in range(256)]
+
+
+# Maximum of an array ignoring NaN, or NaN if there are no values
+def nanmax(values: np.ndarray):
+    values = values[~np.isnan(values)]
+    return values.max() if len(values) > 0 else np.nan
+
+
+# Heatmap intensity of each value relative to maximum, between 0 and 1
+def get_intensities(values: np.ndarray, maximum) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.clip(values / maximum, 0, 1).astype('float32')
+
+
+def format_cells(s: pd.Series):
     """
-    Model for DataTableView to connect for DataFrame data
+    Format a Series of cell values for display in one pass.
+    Returns three lists: the display text (floats rounded to 3 decimals and missing values shown as a dot), the full
+    text of each value, and whether each value is missing.
+    """
+    s = to_numpy_backed(s)
+    # Need to check elementwise since a cell might contain a list or Series, which pd.isna(Series) treats as not missing
+    na = pd.isna(s).values.tolist()
+
+    if s.dtype.kind in 'iub':
+        text = s.astype(str).values.tolist()
+        display = list(text)
+    elif s.dtype.kind == 'f':
+        text = s.astype(str).values.tolist()
+        display = s.round(3).astype(str).values.tolist()
+    else:
+        # Object, datetime, categorical etc. Iterating the Series gives the same boxed scalars as DataFrame.iloc
+        text = [str(cell) for cell in s]
+        display = [str(round(cell, 3)) if isinstance(cell, (float, np.floating)) else t
+                   for cell, t in zip(s, text)]
+
+    display = ["●" if is_na else d for d, is_na in zip(display, na)]
+    return display, text, na
+
+
+class TrackedShapeModel(QtCore.QAbstractTableModel):
+    """
+    Base for models whose shape follows pgdf.df. The row and column counts are cached in self.shape and only updated
+    between the begin and end notifications of a structural change (see DataFrameViewer.refresh_ui), so views can be
+    told about rows and columns being inserted, removed or moved after the DataFrame itself has already changed
     """
 
-    def __init__(self, parent: DataFrameViewer):
+    def __init__(self, parent):
         super().__init__(parent)
         self.dataframe_viewer: DataFrameViewer = parent
         self.pgdf: PandasGuiDataFrameStore = parent.pgdf
+        self.shape = self.current_shape()
+
+    # The (rowCount, columnCount) implied by the current pgdf.df
+    def current_shape(self):
+        raise NotImplementedError
+
+    def rowCount(self, parent=None):
+        return self.shape[0]
+
+    def columnCount(self, parent=None):
+        return self.shape[1]
+
+
+class DataTableModel(TrackedShapeModel):
+    """
+    Model for DataTableView to connect for DataFrame data
+    """
+
+    # Number of rows formatted at once when filling the cell text cache
+    cache_block_size = 256
+    # Maximum number of (row block, column) entries kept in the cell text cache
+    cache_max_blocks = 4096
+
+    def __init__(self, parent: DataFrameViewer):
+        super().__init__(parent)
+
+        # Formatted cell text by (row block, column), in least recently used order. Entries changed in place are dropped
+        # by update_caches, it's cleared if pgdf.data_version changes without that
+        self.text_cache = OrderedDict()
+        self.text_cache_version = None
+
+        # Heatmap intensities by column, see self.get_color_percentiles
+        self.color_cache = {}
+        self.color_cache_key = None
+        self.color_cache_version = None
+        # Maxima the intensities are relative to, cleared along with color_cache
+        self.column_maxima = {}
+        self.row_maxima = None
+        self.all_maximum = None
+        # pgdf.filtered_index_map when update_caches last ran. It's replaced whenever rows are filtered or sorted again
+        self.cache_index_map = None
 
     def headerData(self, section, orientation, role=None):
         # Headers for DataTableView are hidden. Header data is shown in HeaderView
         pass
 
-    def columnCount(self, parent=None):
-        return self.pgdf.df.columns.shape[0]
+    def current_shape(self):
+        return self.dataframe_viewer.shown_row_count(), self.pgdf.df_unfiltered.shape[1]
 
-    def rowCount(self, parent=None):
-        return len(self.pgdf.df)
+    # Rows are added progressively as the table is scrolled to the bottom, see DataFrameViewer.row_limit
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        return self.dataframe_viewer.can_fetch_more()
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        self.dataframe_viewer.fetch_more()
+
+    # Return the formatted text for the block of rows containing this cell, formatting it if it isn't cached
+    def get_text_block(self, row, col):
+        if self.text_cache_version != self.pgdf.data_version:
+            self.text_cache.clear()
+            self.text_cache_version = self.pgdf.data_version
+
+        key = (row // self.cache_block_size, col)
+        try:
+            self.text_cache.move_to_end(key)
+            return self.text_cache[key]
+        except KeyError:
+            pass
+
+        start = key[0] * self.cache_block_size
+        block = format_cells(self.pgdf.filtered_iloc(slice(start, start + self.cache_block_size), col))
+        self.text_cache[key] = block
+        if len(self.text_cache) > self.cache_max_blocks:
+            self.text_cache.popitem(last=False)
+        return block
 
     # Returns the data from the DataFrame
     def data(self, index, role=QtCore.Qt.DisplayRole):
 
         row = index.row()
         col = index.column()
-        cell = self.pgdf.df.iloc[row, col]
 
         if (role == QtCore.Qt.DisplayRole
                 or role == QtCore.Qt.EditRole
                 or role == QtCore.Qt.ToolTipRole):
-            # Need to check type since a cell might contain a list or Series, then .isna returns a Series not a bool
-            cell_is_na = pd.isna(cell)
-            if type(cell_is_na) == bool and cell_is_na:
-                if role == QtCore.Qt.DisplayRole:
-                    return "●"
-                elif role == QtCore.Qt.EditRole:
-                    return ""
-                elif role == QtCore.Qt.ToolTipRole:
-                    return "NaN"
-
-            # Float formatting
-            if isinstance(cell, (float, np.floating)):
-                if role == QtCore.Qt.DisplayRole:
-                    return str(round(cell, 3))
-
-            return str(cell)
-
-        elif role == QtCore.Qt.ToolTipRole:
-            return str(cell)
-
-        elif role == QtCore.Qt.BackgroundRole:
+            display, text, na = self.get_text_block(row, col)
+            i = row % self.cache_block_size
 
-            color_mode = self.dataframe_viewer.color_mode
+            if role == QtCore.Qt.DisplayRole:
+                return display[i]
+            elif na[i]:
+                return "" if role == QtCore.Qt.EditRole else "NaN"
+            else:
+                return text[i]
 
-            if color_mode == None or pd.isna(cell):
+        elif role == QtCore.Qt.BackgroundRole:
+            if self.dataframe_viewer.color_mode is None:
                 return None
 
-            try:
-                x = float(cell)
-            except:
-                # Cell isn't numeric
+            percentiles = self.get_color_percentiles(col)
+            if percentiles is None:
+                # Column isn't numeric
                 return None
 
-            if color_mode == 'all':
-                percentile = cell / self.pgdf.column_statistics['Max'].max()
-            elif color_mode == 'row':
-                percentile = cell / self.pgdf.row_statistics['Max'][row]
-            elif color_mode == 'column':
-                percentile = cell / self.pgdf.column_statistics['Max'][col]
+            percentile = percentiles[row]
+            if np.isnan(percentile):
+                return None
             else:
-                raise ValueError
+                return HEATMAP_COLORS[int(255 * percentile)]
+
+    # Return the heatmap intensity (between 0 and 1) of each cell in a column for the current color_mode, or None if the
+    # column isn't numeric. Computed once per column and cached until the color mode or the column changes
+    def get_color_percentiles(self, col):
+        color_mode = self.dataframe_viewer.color_mode
+        if self.color_cache_key != color_mode or self.color_cache_version != self.pgdf.data_version:
+            self.clear_color_cache()
+            self.color_cache_key = color_mode
+            self.color_cache_version = self.pgdf.data_version
+
+        if col not in self.color_cache:
+            values = self.get_numeric_values(col)
+            if values is None:
+                self.color_cache[col] = None
+            else:
+                if color_mode == 'all':
+                    maximum = self.get_all_maximum(col, values)
+                elif color_mode == 'row':
+                    maximum = self.get_row_maxima()
+                elif color_mode == 'column':
+                    maximum = self.get_column_maximum(col, values)
+                else:
+                    raise ValueError
+                self.color_cache[col] = get_intensities(values, maximum)
 
-            if pd.isna(percentile):
-                return None
+        return self.color_cache[col]
+
+    def clear_color_cache(self):
+        self.color_cache.clear()
+        self.column_maxima.clear()
+        self.row_maxima = None
+        self.all_maximum = None
+
+    def update_caches(self, change: DataChange, rows: Union[np.ndarray, None]):
+        """
+        Drop the cached text and colors made outdated by a change. rows are the positions in pgdf.df of the rows it
+        changed, or None for all of them. Values changed in place only drop the entries for the row blocks and columns
+        they're in, other changes drop everything
+        """
+        version = self.pgdf.data_version
+        # Edits can also move rows in or out of the filters
+        if change.kinds != {'cells'} or self.pgdf.filtered_index_map is not self.cache_index_map:
+            self.text_cache.clear()
+            self.clear_color_cache()
+        else:
+            columns = list(range(self.columnCount())) if change.columns is None else change.columns
+            blocks = None if rows is None else set((rows // self.cache_block_size).tolist())
+            changed_columns = set(columns)
+            for key in [key for key in self.text_cache
+                        if key[1] in changed_columns and (blocks is None or key[0] in blocks)]:
+                del self.text_cache[key]
+            if self.color_cache_version is not None:
+                self.update_color_cache(columns, rows)
+        self.text_cache_version = version
+        self.color_cache_version = version
+        self.cache_index_map = self.pgdf.filtered_index_map
+
+    def update_color_cache(self, columns: List[int], rows: Union[np.ndarray, None]):
+        # Intensities of other columns change too when the maxima they're relative to change
+        for col in columns:
+            self.color_cache.pop(col, None)
+            self.column_maxima.pop(col, None)
+        if self.color_cache_key == 'all' and self.all_maximum is not None:
+            previous = self.all_maximum
+            self.all_maximum = None
+            if not np.array_equal(previous, self.get_all_maximum(), equal_nan=True):
+                self.color_cache.clear()
+        elif self.color_cache_key == 'row' and self.row_maxima is not None:
+            self.row_maxima = None
+            if rows is None:
+                self.color_cache.clear()
+                return
+            maxima = self.get_row_maxima()[rows]
+            for col, percentiles in self.color_cache.items():
+                if percentiles is not None:
+                    values = to_numpy_backed(self.pgdf.filtered_iloc(rows, col)).to_numpy(dtype='float32',
+                                                                                          na_value=np.nan)
+                    percentiles[rows] = get_intensities(values, maxima)
+
+    # Maximum of all numeric columns, for the 'all' color mode. values are the numeric values of col if they were
+    # already converted
+    def get_all_maximum(self, col=None, values=None):
+        if self.all_maximum is None:
+            maxima = [self.get_column_maximum(i, values if i == col else None)
+                      for i in range(self.columnCount()) if self.is_numeric_column(i)]
+            self.all_maximum = nanmax(np.array(maxima, dtype='float32'))
+        return self.all_maximum
+
+    # Maximum of each row of pgdf.df, for the 'row' color mode
+    def get_row_maxima(self):
+        if self.row_maxima is None:
+            self.row_maxima = self.pgdf.row_statistics['Max'].to_numpy(dtype='float32')
+        return self.row_maxima
+
+    def is_numeric_column(self, col):
+        dtype = self.pgdf.df_unfiltered.dtypes.iloc[col]
+        return pd.api.types.is_numeric_dtype(dtype.numpy_dtype if is_arrow_dtype(dtype) else dtype)
+
+    # Return a column of pgdf.df as a float32 array, or None if it isn't numeric
+    def get_numeric_values(self, col):
+        if not self.is_numeric_column(col):
+            return None
+        return to_numpy_backed(self.pgdf.filtered_iloc(columns=col)).to_numpy(dtype='float32', na_value=np.nan)
+
+    # Maximum of a numeric column of pgdf.df. Taken from its statistics when they're up to date, otherwise from values
+    # (the column's get_numeric_values) if they were already converted, so columns aren't converted just for this
+    def get_column_maximum(self, col, values=None):
+        if col not in self.column_maxima:
+            statistics = self.pgdf.get_current_column_statistics(col)
+            if statistics is not None and not statistics.min_max_outdated and 'Max' not in statistics.estimates:
+                maximum = statistics.max
+            elif values is not None:
+                maximum = nanmax(values)
             else:
-                return QtGui.QColor(QtGui.QColor(255, 0, 0, int(255 * percentile)))
+                maximum = self.pgdf.filtered_iloc(columns=col).max()
+            self.column_maxima[col] = np.nan if pd.isna(maximum) else float(maximum)
+        return self.column_maxima[col]
 
     def flags(self, index):
         if self.dataframe_viewer.pgdf.settings.editable:
@@ -506,36 +978,34 @@ class DataTableView(QtWidgets.QTableView):
         # Width
         width = 2 * self.frameWidth()  # Account for border & padding
         # width += self.verticalScrollBar().width()  # Dark theme has scrollbars always shown
-        for i in range(self.model().columnCount()):
-            width += self.columnWidth(i)
+        width += self.horizontalHeader().length()
 
         # Height
         height = 2 * self.frameWidth()  # Account for border & padding
         # height += self.horizontalScrollBar().height()  # Dark theme has scrollbars always shown
-        for i in range(self.model().rowCount()):
-            height += self.rowHeight(i)
+        height += self.verticalHeader().length()
 
         return QtCore.QSize(width, height)
 
 
-class HeaderModel(QtCore.QAbstractTableModel):
+class HeaderModel(TrackedShapeModel):
+    label_block_size = 256
+    # Maximum number of blocks kept in the label cache
+    label_max_blocks = 1024
 
     def __init__(self, parent, orientation):
-        super().__init__(parent)
         self.orientation = orientation
-        self.pgdf: PandasGuiDataFrameStore = parent.pgdf
+        super().__init__(parent)
 
-    def columnCount(self, parent=None):
-        if self.orientation == Qt.Horizontal:
-            return self.pgdf.df.columns.shape[0]
-        else:  # Vertical
-            return self.pgdf.df.index.nlevels
+        # Header label strings, in least recently used order. See self.get_label
+        self.label_cache = OrderedDict()
+        self.label_cache_axis = None
 
-    def rowCount(self, parent=None):
+    def current_shape(self):
         if self.orientation == Qt.Horizontal:
-            return self.pgdf.df.columns.nlevels
-        elif self.orientation == Qt.Vertical:
-            return self.pgdf.df.index.shape[0]
+            return self.pgdf.df_unfiltered.columns.nlevels, self.pgdf.df_unfiltered.columns.shape[0]
+        else:  # Vertical
+            return self.dataframe_viewer.shown_row_count(), self.pgdf.df_unfiltered.index.nlevels
 
     def data(self, index, role=QtCore.Qt.DisplayRole):
         row = index.row()
@@ -544,29 +1014,49 @@ class HeaderModel(QtCore.QAbstractTableModel):
         if role == QtCore.Qt.DisplayRole or role == QtCore.Qt.ToolTipRole:
 
             if self.orientation == Qt.Horizontal:
-
-                if isinstance(self.pgdf.df.columns, pd.MultiIndex):
-                    return str(self.pgdf.df.columns[col][row])
-                else:
-                    return str(self.pgdf.df.columns[col])
+                return self.get_label(col, row)
 
             elif self.orientation == Qt.Vertical:
-
-                if isinstance(self.pgdf.df.index, pd.MultiIndex):
-                    return str(self.pgdf.df.index[row][col])
-                else:
-                    return str(self.pgdf.df.index[row])
+                return self.get_label(row, col)
 
         if role == QtCore.Qt.DecorationRole:
-            if self.pgdf.sort_state == "Asc":
-                icon = QtGui.QIcon(os.path.join(pandasgui.__path__[0], "resources/images/sort-ascending.svg"))
-            elif self.pgdf.sort_state == "Desc":
-                icon = QtGui.QIcon(os.path.join(pandasgui.__path__[0], "resources/images/sort-descending.svg"))
-            else:
-                return
+            if row == self.rowCount() - 1 and self.orientation == Qt.Horizontal:
+                return get_sort_icon(self.pgdf.get_column_sort_state(col))
 
-            if col == self.pgdf.sorted_column_ix and row == self.rowCount() - 1 and self.orientation == Qt.Horizontal:
-                return icon
+    def get_label(self, position, level):
+        """
+        Return the label at a position along the axis, for one level of a MultiIndex.
+        Labels are cached until the axis is replaced. MultiIndex levels are converted from their unique values and
+        codes in one pass, other axes are converted in blocks as they are shown and the least recently used blocks are
+        dropped beyond label_max_blocks.
+        The index labels are cached by their position in df_unfiltered, so the cache stays valid when filters change
+        """
+        if self.orientation == Qt.Horizontal:
+            axis = self.pgdf.df_unfiltered.columns
+        else:
+            axis = self.pgdf.df_unfiltered.index
+            position = self.pgdf.filtered_index_map[position]
+        if self.label_cache_axis is not axis:
+            self.label_cache = OrderedDict()
+            self.label_cache_axis = axis
+
+        if isinstance(axis, pd.MultiIndex):
+            if level not in self.label_cache:
+                # Missing values have code -1, which picks the last item
+                level_labels = np.array([str(value) for value in axis.levels[level]] + [str(np.nan)], dtype=object)
+                self.label_cache[level] = level_labels[axis.codes[level]]
+            return self.label_cache[level][position]
+        else:
+            block_size = self.label_block_size
+            block = position // block_size
+            try:
+                self.label_cache.move_to_end(block)
+            except KeyError:
+                start = block * block_size
+                self.label_cache[block] = [str(value) for value in axis[start: start + block_size]]
+                if len(self.label_cache) > self.label_max_blocks:
+                    self.label_cache.popitem(last=False)
+            return self.label_cache[block][position % block_size]
 
     # The headers of this table will show the level names of the MultiIndex
     def headerData(self, section, orientation, role=None):
@@ -618,7 +1108,15 @@ class HeaderView(QtWidgets.QTableView):
 
         # Link selection to DataTable
         self.selectionModel().selectionChanged.connect(lambda x: self.on_selectionChanged())
+
+        # Spans of repeated MultiIndex values, see self.set_spans
+        self.span_runs = []
+        self.span_runs_axis = None
+        self.span_runs_positions = None
+        self.spans_applied_range = None
         self.set_spans()
+        self.horizontalScrollBar().valueChanged.connect(lambda: self.apply_visible_spans())
+        self.verticalScrollBar().valueChanged.connect(lambda: self.apply_visible_spans())
 
         self.horizontalHeader().hide()
         self.verticalHeader().hide()
@@ -641,10 +1139,10 @@ class HeaderView(QtWidgets.QTableView):
         ix = self.indexAt(point)
         col = ix.column()
         if event.button() == QtCore.Qt.LeftButton:
-            # When a header is clicked, sort the DataFrame by that column
+            # When a header is clicked, sort the DataFrame by that column. Shift adds it as a secondary sort key
             if self.orientation == Qt.Horizontal:
 
-                self.pgdf.sort_column(col)
+                self.pgdf.sort_column(col, append=bool(event.modifiers() & Qt.ShiftModifier))
             else:
                 self.on_selectionChanged()
         else:
@@ -654,7 +1152,7 @@ class HeaderView(QtWidgets.QTableView):
         point = event.pos()
         ix = self.indexAt(point)
         col = ix.column()
-        col_name = self.pgdf.df.columns[col]
+        col_name = self.pgdf.df_unfiltered.columns[col]
         if event.button() == QtCore.Qt.RightButton and self.orientation == Qt.Horizontal:
             self.dataframe_viewer.show_column_menu(col)
         else:
@@ -676,7 +1174,7 @@ class HeaderView(QtWidgets.QTableView):
                 selection = self.selectionModel().selection()
 
                 # Removes the higher levels so that only the lowest level of the header affects the data table selection
-                last_row_ix = self.pgdf.df.columns.nlevels - 1
+                last_row_ix = self.pgdf.df_unfiltered.columns.nlevels - 1
                 last_col_ix = self.model().columnCount() - 1
                 higher_levels = QtCore.QItemSelection(self.model().index(0, 0),
                                                       self.model().index(last_row_ix - 1, last_col_ix))
@@ -690,7 +1188,7 @@ class HeaderView(QtWidgets.QTableView):
                 selection = self.selectionModel().selection()
 
                 last_row_ix = self.model().rowCount() - 1
-                last_col_ix = self.pgdf.df.index.nlevels - 1
+                last_col_ix = self.pgdf.df_unfiltered.index.nlevels - 1
                 higher_levels = QtCore.QItemSelection(self.model().index(0, 0),
                                                       self.model().index(last_row_ix, last_col_ix - 1))
                 selection.merge(higher_levels, QtCore.QItemSelectionModel.Deselect)
@@ -709,10 +1207,10 @@ class HeaderView(QtWidgets.QTableView):
         return
 
         if self.orientation == Qt.Horizontal:
-            if self.pgdf.df.columns.nlevels == 1:
+            if self.pgdf.df_unfiltered.columns.nlevels == 1:
                 return
         else:
-            if self.pgdf.df.index.nlevels == 1:
+            if self.pgdf.df_unfiltered.index.nlevels == 1:
                 return
 
         for ix in self.selectedIndexes():
@@ -727,85 +1225,74 @@ class HeaderView(QtWidgets.QTableView):
                     ix2 = self.model().index(ix.row(), col)
                     self.setSelection(self.visualRect(ix2), QtCore.QItemSelectionModel.Select)
 
-    # This sets spans to group together adjacent cells with the same values
+    # This sets spans to group together adjacent cells with the same values.
+    # Only spans intersecting the visible part of the header are applied, and more are added as it scrolls
     def set_spans(self):
+        self.spans_applied_range = None
+        self.apply_visible_spans()
 
-        df = self.pgdf.df
-        self.clearSpans()
-        # Find spans for horizontal HeaderView
+    # Return the (starts, lengths) arrays of the runs of equal adjacent values for each level of this header's axis
+    def get_span_runs(self):
         if self.orientation == Qt.Horizontal:
-
-            # Find how many levels the MultiIndex has
-            if isinstance(df.columns, pd.MultiIndex):
-                N = len(df.columns[0])
+            axis = self.pgdf.df_unfiltered.columns
+            positions = None
+        else:
+            axis = self.pgdf.df_unfiltered.index
+            positions = self.pgdf.filtered_index_map
+
+        # Index objects are immutable so the cache stays valid as long as the DataFrame has the same axis object and
+        # the same rows are filtered
+        if self.span_runs_axis is not axis or self.span_runs_positions is not positions:
+            if isinstance(axis, pd.MultiIndex):
+                level_codes = [np.asarray(codes) for codes in axis.codes]
             else:
-                N = 1
+                level_codes = [pd.factorize(axis)[0]]
+            if positions is not None:
+                level_codes = [codes[positions] for codes in level_codes]
+            self.span_runs = [find_spans(codes) for codes in level_codes]
+            self.span_runs_axis = axis
+            self.span_runs_positions = positions
 
-            for level in range(N):  # Iterates over the levels
-                # Find how many segments the MultiIndex has
-                if isinstance(df.columns, pd.MultiIndex):
-                    arr = [df.columns[i][level] for i in range(len(df.columns))]
-                else:
-                    arr = df.columns
-
-                # Holds the starting index of a range of equal values.
-                # None means it is not currently in a range of equal values.
-                match_start = None
-
-                for col in range(1, len(arr)):  # Iterates over cells in row
-                    # Check if cell matches cell to its left
-                    if arr[col] == arr[col - 1]:
-                        if match_start is None:
-                            match_start = col - 1
-                        # If this is the last cell, need to end it
-                        if col == len(arr) - 1:
-                            match_end = col
-                            span_size = match_end - match_start + 1
-                            self.setSpan(level, match_start, 1, span_size)
-                    else:
-                        if match_start is not None:
-                            match_end = col - 1
-                            span_size = match_end - match_start + 1
-                            self.setSpan(level, match_start, 1, span_size)
-                            match_start = None
+        return self.span_runs
 
-        # Find spans for vertical HeaderView
+    def apply_visible_spans(self):
+        if self.orientation == Qt.Horizontal:
+            first = self.columnAt(0)
+            last = self.columnAt(self.viewport().width() - 1)
+            count = self.model().columnCount()
         else:
-            # Find how many levels the MultiIndex has
-            if isinstance(df.index, pd.MultiIndex):
-                N = len(df.index[0])
-            else:
-                N = 1
+            first = self.rowAt(0)
+            last = self.rowAt(self.viewport().height() - 1)
+            count = self.model().rowCount()
+        first = max(first, 0)
+        last = count - 1 if last == -1 else last
+
+        # Skip if the visible range is within what was applied already
+        if self.spans_applied_range is not None:
+            applied_first, applied_last = self.spans_applied_range
+            if applied_first <= first and last <= applied_last:
+                return
 
-            for level in range(N):  # Iterates over the levels
+        # Apply an extra screen of spans in each direction so small scrolls don't need to re-apply them
+        margin = last - first + 1
+        first = max(first - margin, 0)
+        last = min(last + margin, count - 1)
 
-                # Find how many segments the MultiIndex has
-                if isinstance(df.index, pd.MultiIndex):
-                    arr = [df.index[i][level] for i in range(len(df.index))]
+        self.clearSpans()
+        for level, (starts, lengths) in enumerate(self.get_span_runs()):
+            ends = starts + lengths - 1
+            visible = (starts <= last) & (ends >= first)
+            for start, length in zip(starts[visible].tolist(), lengths[visible].tolist()):
+                if self.orientation == Qt.Horizontal:
+                    self.setSpan(level, start, 1, length)
                 else:
-                    arr = df.index
-
-                # Holds the starting index of a range of equal values.
-                # None means it is not currently in a range of equal values.
-                match_start = None
-
-                for row in range(1, len(arr)):  # Iterates over cells in column
-
-                    # Check if cell matches cell above
-                    if arr[row] == arr[row - 1]:
-                        if match_start is None:
-                            match_start = row - 1
-                        # If this is the last cell, need to end it
-                        if row == len(arr) - 1:
-                            match_end = row
-                            span_size = match_end - match_start + 1
-                            self.setSpan(match_start, level, span_size, 1)
-                    else:
-                        if match_start is not None:
-                            match_end = row - 1
-                            span_size = match_end - match_start + 1
-                            self.setSpan(match_start, level, span_size, 1)
-                            match_start = None
+                    self.setSpan(start, level, length, 1)
+
+        self.spans_applied_range = (first, last)
+
+    def resizeEvent(self, event: QtGui.QResizeEvent):
+        super().resizeEvent(event)
+        self.apply_visible_spans()
 
     def eventFilter(self, object: QtCore.QObject, event: QtCore.QEvent):
         if event.type() in [QtCore.QEvent.MouseButtonPress,
@@ -982,11 +1469,11 @@ class HeaderNamesModel(QtCore.QAbstractTableModel):
         if self.orientation == Qt.Horizontal:
             return 1
         elif self.orientation == Qt.Vertical:
-            return self.pgdf.df.index.nlevels
+            return self.pgdf.df_unfiltered.index.nlevels
 
     def rowCount(self, parent=None):
         if self.orientation == Qt.Horizontal:
-            return self.pgdf.df.columns.nlevels
+            return self.pgdf.df_unfiltered.columns.nlevels
         elif self.orientation == Qt.Vertical:
             return 1
 
@@ -997,27 +1484,20 @@ class HeaderNamesModel(QtCore.QAbstractTableModel):
         if role == QtCore.Qt.DisplayRole or role == QtCore.Qt.ToolTipRole:
 
             if self.orientation == Qt.Horizontal:
-                val = self.pgdf.df.columns.names[row]
+                val = self.pgdf.df_unfiltered.columns.names[row]
                 if val is None:
                     val = ""
                 return str(val)
 
             elif self.orientation == Qt.Vertical:
-                val = self.pgdf.df.index.names[col]
+                val = self.pgdf.df_unfiltered.index.names[col]
                 if val is None:
                     val = "index"
                 return str(val)
 
         if role == QtCore.Qt.DecorationRole:
-            if self.pgdf.sort_state == "Asc":
-                icon = QtGui.QIcon(os.path.join(pandasgui.__path__[0], "resources/images/sort-ascending.svg"))
-            elif self.pgdf.sort_state == "Desc":
-                icon = QtGui.QIcon(os.path.join(pandasgui.__path__[0], "resources/images/sort-descending.svg"))
-            else:
-                return
-
             if col == self.pgdf.sorted_index_level and self.orientation == Qt.Vertical:
-                return icon
+                return get_sort_icon(self.pgdf.sort_state)
 
 
 class HeaderNamesView(QtWidgets.QTableView):
@@ -1086,7 +1566,7 @@ class HeaderNamesView(QtWidgets.QTableView):
 
     def columnWidth(self, column: int) -> int:
         if self.orientation == Qt.Horizontal:
-            if all(name is None for name in self.pgdf.df.columns.names):
+            if all(name is None for name in self.pgdf.df_unfiltered.columns.names):
                 return 0
             else:
                 return super().columnWidth(column)
@@ -8,7 +8,7 @@ from PyQt5.QtGui import QDesktopServices
 from PyQt5.QtCore import QUrl
 from pandasgui.utility import nunique, unique
 
-from pandasgui.store import PandasGuiDataFrameStore
+from pandasgui.store import PandasGuiDataFrameStore, DataChange
 import pandasgui
 
 import logging
@@ -63,23 +63,10 @@ class FilterViewer(QtWidgets.QWidget):
         self.list_model = self.ListModel(pgdf)
         self.list_view.setModel(self.list_model)
 
-        # autocompletion for QLineEdit
-        columns = self.pgdf.df_unfiltered.columns
-        valid_values = [f"`{col}`" for col in columns]
-        categoricals = columns[self.pgdf.df_unfiltered.dtypes == "category"]
-        low_cardinality = columns[nunique(self.pgdf.df_unfiltered) < CATEGORICAL_THRESHOLD]
-
-        # make unique the column names
-        all_categoricals = list(set(categoricals) | set(low_cardinality))
-
-        for col in all_categoricals:
-            if col in categoricals:
-                in_dataset = [f'"{val}"' for val in self.pgdf.df_unfiltered[col].cat.categories]
-            else:
-                in_dataset = [f'"{val}"' for val in unique(self.pgdf.df_unfiltered[col])]
-            valid_values.extend(in_dataset)
-
-        self.completer = Completer(valid_values)
+        # autocompletion for QLineEdit. Completions are found by self.load_completions when the first key is typed,
+        # since counting unique values of every column is slow for wide DataFrames
+        self.completer = Completer([])
+        self.completions_loaded = False
         self.completer.setCaseSensitivity(Qt.CaseInsensitive)
         self.completer.setFilterMode(Qt.MatchContains)
 
@@ -94,6 +81,8 @@ class FilterViewer(QtWidgets.QWidget):
 
         # Signals
         self.text_input.returnPressed.connect(self.add_filter)
+        self.text_input.installEventFilter(self)
+        pgdf.change_bus.subscribe(self.on_data_changed)
 
         # Layout
         self.new_filter_layout = QtWidgets.QHBoxLayout()
@@ -104,6 +93,35 @@ class FilterViewer(QtWidgets.QWidget):
         self.layout.addWidget(self.list_view)
         self.setLayout(self.layout)
 
+    def eventFilter(self, obj: QtCore.QObject, event: QtCore.QEvent):
+        if obj is self.text_input and event.type() == QtCore.QEvent.KeyPress and not self.completions_loaded:
+            self.load_completions()
+        return super().eventFilter(obj, event)
+
+    def on_data_changed(self, change: DataChange):
+        # Completions are column names and values, find them again when the next key is typed
+        if change.kinds & {'reset', 'cells', 'column_removed', 'columns_moved'}:
+            self.completions_loaded = False
+
+    def load_completions(self):
+        columns = self.pgdf.df_unfiltered.columns
+        valid_values = [f"`{col}`" for col in columns]
+        categoricals = columns[self.pgdf.df_unfiltered.dtypes == "category"]
+        low_cardinality = columns[nunique(self.pgdf.df_unfiltered) < CATEGORICAL_THRESHOLD]
+
+        # make unique the column names
+        all_categoricals = list(set(categoricals) | set(low_cardinality))
+
+        for col in all_categoricals:
+            if col in categoricals:
+                in_dataset = [f'"{val}"' for val in self.pgdf.df_unfiltered[col].cat.categories]
+            else:
+                in_dataset = [f'"{val}"' for val in unique(self.pgdf.df_unfiltered[col])]
+            valid_values.extend(in_dataset)
+
+        self.completer.setModel(QtCore.QStringListModel(valid_values, self.completer))
+        self.completions_loaded = True
+
     def add_filter(self):
         expr = self.text_input.text()
         if not expr == "":
@@ -1,10 +1,13 @@
 import re
 import time
 
+import numpy as np
 import pkg_resources
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtCore import Qt
 
+from pandasgui.utility import to_numpy_backed
+
 
 class FindToolbar(QtWidgets.QToolBar):
     def __init__(self, parent=None):
@@ -141,7 +144,6 @@ class FindToolbar(QtWidgets.QToolBar):
         current_pgdf = self.parent().store.selected_pgdf
         current_dataView = current_pgdf.dataframe_viewer.dataView
         current_model = current_dataView.model()
-        df = current_pgdf.df
 
         # clear matches and selection from last search results
         if self.findThread:
@@ -155,7 +157,7 @@ class FindToolbar(QtWidgets.QToolBar):
             return
 
         # Initialize findThread
-        self.findThread = FindThread(df, text, self.match_flags)
+        self.findThread = FindThread(current_pgdf, text, self.match_flags)
         self.findThread.matches.connect(self.update_matches)
         self.findThread.start()
 
@@ -338,105 +340,84 @@ class ButtonLineEdit(QtWidgets.QLineEdit):
 class FindThread(QtCore.QThread):
     matches = QtCore.pyqtSignal(list)
 
-    def __init__(self, df, text, match_flags, parent=None):
+    def __init__(self, pgdf, text, match_flags, parent=None):
         """
         Thread to search DataFrame for a string.
 
         Args:
-            df: Type pd.DataFrame
+            pgdf: PandasGuiDataFrameStore whose filtered rows are searched
             text: Text to search for. Type string.
             match_flags: User enabled match flags. Can match case, regex, or exact.
                          Type dict.
         """
         QtCore.QThread.__init__(self, parent=parent)
         self.isRunning = True
-        self.df = df
+        # Keep references to the current data, so the search isn't affected if it's replaced while running. Chunks are
+        # read from these as they are searched instead of copying the DataFrame
+        self.df_unfiltered = pgdf.df_unfiltered
+        self.positions = pgdf.filtered_index_map
         self.text = text
         self.match_flags = match_flags
         self.max_chunk_size = 10000
-        self.chunks = self.split_chunks()
 
-    def split_chunks(self):
+    def get_chunk(self, col_idx, start):
         """
-        Splits each Series in the DataFrame into many Series.
-        Number of chunks outputted depends on size of each column
-        and self.max_chunk_size.
+        Rows start to start + self.max_chunk_size of a column of the filtered DataFrame.
 
         Returns:
-            chunks: List of pd.Series.
+            chunk: pd.Series.
         """
-        chunks = []
-        for col_idx, col_name in enumerate(self.df.columns):
-            column = self.df[col_name].copy()
-            while len(column) > 0:
-                chunk = column.iloc[: self.max_chunk_size]
-                chunks.append(chunk)
-                column = column.iloc[self.max_chunk_size:]
-        return chunks
+        column = self.df_unfiltered.iloc[:, col_idx]
+        return column.iloc[self.positions[start: start + self.max_chunk_size]]
 
     def get_matches(self, chunk):
         """
-        Gets row numbers of matches.
+        Gets which rows of the chunk match.
 
         Args:
             chunk: Type pd.Series
+
+        Returns:
+            Boolean array, True where the row matches
         """
+        # Search arrow backed columns as they would be displayed
+        chunk = to_numpy_backed(chunk)
         if self.match_flags["whole word"]:
             if self.match_flags["case"]:
-                rows_with_match = chunk[chunk.astype(str) == self.text]
+                check_for_match = chunk.astype(str) == self.text
             else:
-                rows_with_match = chunk[
-                    chunk.astype(str).str.lower() == self.text.lower()
-                    ]
+                check_for_match = chunk.astype(str).str.lower() == self.text.lower()
         else:
             pd_match_flags = self.match_flags.copy()
             pd_match_flags.pop("whole word")
             check_for_match = chunk.astype(str).str.contains(
                 self.text, **pd_match_flags
             )
-            rows_with_match = chunk[check_for_match]
 
-        return rows_with_match
+        return check_for_match.to_numpy(dtype=bool)
 
     def run(self):
-        col_idx = 0
-        # since the chunks don't preserve row number, need to keep track of
-        # chunks processed to get row number
-        chunks_in_column = 0
-        for chunk in self.chunks:
-            try:
-                # gives series with dtype bool
-                rows_with_match = self.get_matches(chunk)
-                # gives indicies where the series is True
-                row_idx_with_match = [
-                    chunk.index.get_loc(i) + chunks_in_column * self.max_chunk_size
-                    for i in rows_with_match.index
-                ]
+        for col_idx in range(self.df_unfiltered.shape[1]):
+            for start in range(0, len(self.positions), self.max_chunk_size):
+                try:
+                    matched = self.get_matches(self.get_chunk(col_idx, start))
+                except re.error:
+                    self.isRunning = False
+                    return
+
                 # output list of table coordinates where match is found
-                coords_with_match = [
-                    (row_idx, col_idx) for row_idx in row_idx_with_match
-                ]
+                coords_with_match = [(row_idx, col_idx) for row_idx in (np.flatnonzero(matched) + start).tolist()]
 
                 # check if a stop is requested
                 # (in case the user types another letter)
                 if self.isRunning:
                     self.matches.emit(coords_with_match)
                 else:
-                    break
-
-                chunks_in_column += 1
-
-                # if the last index of the chunk is equal to the last index
-                # of the whole dataframe, move to the next column
-                if chunk.index[-1] == self.df.index[-1]:
-                    col_idx += 1
-                    chunks_in_column = 0
+                    return
 
                 # waits 50 milliseconds to process gui interactions,
                 # so the gui does not freeze
                 time.sleep(0.05)
-            except re.error:
-                break
         self.isRunning = False
 
     def stop(self):
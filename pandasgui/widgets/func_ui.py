@@ -187,8 +187,9 @@ class FuncUi(QtWidgets.QWidget):
             format_kwargs(self.get_data())))
 
         # Sources list
-        self.source_tree = SourceTree(self.df)
-        self.source_tree2 = SourceTree(self.df)
+        source_pgdf = PandasGuiDataFrameStore.cast(self.df)
+        self.source_tree = SourceTree(source_pgdf)
+        self.source_tree2 = SourceTree(source_pgdf)
 
         # Destinations tree
         self.dest_tree = DestinationTree(self)
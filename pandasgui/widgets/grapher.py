@@ -9,8 +9,9 @@ import plotly
 from PyQt5 import QtCore, QtGui, QtWidgets
 from PyQt5.QtCore import Qt
 from pandasgui.jotly import generate_title
+from pandasgui.utility import is_shown
 
-from pandasgui.store import PandasGuiDataFrameStore
+from pandasgui.store import PandasGuiDataFrameStore, DataChange
 from pandasgui.widgets.collapsible_panel import CollapsiblePanel
 
 from pandasgui.widgets.figure_viewer import FigureViewer
@@ -136,6 +137,10 @@ class Grapher(QtWidgets.QWidget):
             pass  # running Grapher solo
         self.func_ui.saving.connect(self.on_dragger_saving)
 
+        # Set when the data changes while this is hidden, so the plot is remade when it's shown
+        self.plot_outdated = False
+        self.pgdf.change_bus.subscribe(self.on_data_changed)
+
     def on_type_changed(self):
         if len(self.type_picker.selectedItems()) == 0:
             return
@@ -159,13 +164,53 @@ class Grapher(QtWidgets.QWidget):
             self.pgdf.add_history_item("Grapher",
                                        f"fig.write_html('{filename})'")
 
+    def on_data_changed(self, change: DataChange):
+        if not is_shown(self):
+            self.plot_outdated = True
+            return
+
+        # Moving columns or changing columns that aren't plotted doesn't change the plot
+        if change.kinds == {'columns_moved'}:
+            return
+        if change.kinds == {'cells'} and change.columns is not None:
+            used = self.get_used_columns(self.func_ui.get_data())
+            if not any(ix in used for ix in change.columns):
+                return
+        self.on_dragger_finished()
+
+    def showEvent(self, event: QtGui.QShowEvent):
+        self.replot_if_outdated()
+        super().showEvent(event)
+
+    def replot_if_outdated(self):
+        if self.plot_outdated:
+            self.plot_outdated = False
+            self.on_dragger_finished()
+
+    # Positions of the columns named in the plot arguments
+    def get_used_columns(self, kwargs):
+        used_names = set()
+        for value in kwargs.values():
+            for name in (value if isinstance(value, list) else [value]):
+                if isinstance(name, str):
+                    used_names.add(name)
+        return [ix for ix, name in enumerate(self.pgdf.df_unfiltered.columns) if name in used_names]
+
     def on_dragger_finished(self):
         kwargs = self.func_ui.get_data()
 
         func = self.current_schema.function
 
+        if self.pgdf.any_rows_rearranged():
+            # Only take the columns used in the plot from the rows shown, instead of building the whole sorted and
+            # filtered DataFrame
+            data_frame = self.pgdf.filtered_iloc(columns=self.get_used_columns(kwargs))
+        else:
+            # Plotting doesn't change the data, so it doesn't need the copy in pgdf.df
+            data_frame = self.pgdf.df_unfiltered
+
         try:
-            self.fig = func(data_frame=self.pgdf.df, **kwargs)
+            self.fig = func(data_frame=data_frame, **kwargs)
             # Generate a title and apply it to the figure
             self.fig.update_layout(title=generate_title(self.pgdf, self.current_schema.name, kwargs))
 
@@ -80,6 +80,19 @@ class SettingsEditor(QtWidgets.QWidget):
                 widget.setCheckState(Qt.Checked if setting.value else Qt.Unchecked)
                 widget.stateChanged.connect(setter)
 
+            elif setting.dtype == int:
+
+                def setter(new_val, item=item):
+                    try:
+                        item.setData(1, Qt.UserRole, new_val)
+                    except:
+                        pass
+
+                widget = QtWidgets.QSpinBox()
+                widget.setRange(0, 2 ** 31 - 1)
+                widget.setValue(setting.value)
+                widget.valueChanged.connect(setter)
+
             elif get_origin(setting.dtype) == Literal:
 
                 def setter(new_val, item=item):
@@ -46,14 +46,14 @@ class Spinner(QWidget):
 
     def updateTimer(self):
         self.timer.setInterval(
-            1000 / (self.mNumberOfLines * self.mRevolutionsPerSecond)
+            int(1000 / (self.mNumberOfLines * self.mRevolutionsPerSecond))
         )
 
     def updatePosition(self):
         if self.parentWidget() and self.mCenterOnParent:
             self.move(
-                self.parentWidget().width() / 2 - self.width() / 2,
-                self.parentWidget().height() / 2 - self.height() / 2,
+                self.parentWidget().width() // 2 - self.width() // 2,
+                self.parentWidget().height() // 2 - self.height() // 2,
             )
 
     def lineCountDistanceFromPrimary(self, current, primary, totalNrOfLines):
@@ -108,7 +108,7 @@ class Spinner(QWidget):
                 self.mNumberOfLines,
                 self.mTrailFadePercentage,
                 self.mMinimumTrailOpacity,
-                self.mColor,
+                QColor(self.mColor),
             )
             painter.setBrush(color)
             painter.drawRoundedRect(
@@ -121,6 +121,8 @@ class Spinner(QWidget):
     def start(self):
         self.updatePosition()
         self.mIsSpinning = True
+        self.show()
+        self.raise_()
 
         if self.parentWidget() and self.mDisableParentWhenSpinning:
             self.parentWidget().setEnabled(False)
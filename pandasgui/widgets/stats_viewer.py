@@ -1,7 +1,7 @@
 import sys
-from PyQt5 import QtWidgets
+import pandas as pd
+from PyQt5 import QtGui, QtWidgets
 
-from pandasgui.utility import clear_layout
 from pandasgui.widgets.dataframe_viewer import DataFrameViewer
 from pandasgui.store import PandasGuiDataFrameStore
 
@@ -18,15 +18,33 @@ class StatisticsViewer(QtWidgets.QWidget):
 
         self.layout = QtWidgets.QVBoxLayout()
         self.setLayout(self.layout)
-        self.dataframe_viewer = DataFrameViewer(self.pgdf.column_statistics)
+        # The same store and viewer are kept for the life of this widget, new statistics are put into them by
+        # refresh_statistics. Statistics of the statistics table itself aren't computed
+        statistics_pgdf = PandasGuiDataFrameStore(self.get_statistics(), statistics_enabled=False)
+        self.dataframe_viewer = DataFrameViewer(statistics_pgdf)
         self.layout.addWidget(self.dataframe_viewer)
 
-    # Replace the data in self.dataframe_viewer pgdf with the current statistics of the main pgdf
+    def get_statistics(self) -> pd.DataFrame:
+        # Statistics are None when refresh_statistics is turned off and they haven't been computed yet
+        return pd.DataFrame() if self.pgdf.column_statistics is None else self.pgdf.column_statistics
+
+    def showEvent(self, event: QtGui.QShowEvent):
+        self.refresh_if_outdated()
+        super().showEvent(event)
+
+    # Statistics aren't computed while this is hidden, see PandasGuiDataFrameStore.update_statistics
+    def refresh_if_outdated(self):
+        if self.pgdf.statistics_outdated:
+            self.pgdf.refresh_statistics()
+
+    # Put the current statistics of the main pgdf into self.dataframe_viewer's pgdf
     def refresh_statistics(self):
-        # self.dataframe_viewer.pgdf.paste_data(0, 0, self.pgdf.column_statistics)
-        clear_layout(self.layout)
-        self.dataframe_viewer = DataFrameViewer(self.pgdf.column_statistics)
-        self.layout.addWidget(self.dataframe_viewer)
+        self.dataframe_viewer.pgdf.replace_df(self.get_statistics())
+        # Values may be longer than the ones the columns were sized for, like results of columns that were pending
+        viewer = self.dataframe_viewer
+        viewer.columns_sized = [False] * viewer.dataView.model().columnCount()
+        viewer.auto_size_visible_columns()
+        viewer.auto_size_timer.start()
 
 
 if __name__ == "__main__":
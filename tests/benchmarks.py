@@ -0,0 +1,203 @@
+"""
+Rendering benchmarks for the DataFrame table view. Runs headless using the Qt offscreen platform.
+
+Each case (frame size and dtype) runs in its own process so peak memory isn't shared between cases, and the results
+are saved as JSON. Example:
+    python tests/benchmarks.py --rows 10000 1000000 --dtypes int str --output results.json
+
+Times are in milliseconds and memory in MB. Compare the JSON from before and after a change to catch regressions
+"""
+import os
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+DTYPES = ['int', 'float', 'str', 'mixed']
+
+
+def generate_frame(rows, cols, dtype, seed=0):
+    rng = np.random.default_rng(seed)
+    columns = {}
+    for i in range(cols):
+        kind = ['int', 'float', 'str', 'datetime'][i % 4] if dtype == 'mixed' else dtype
+        if kind == 'int':
+            values = rng.integers(0, 100, rows)
+        elif kind == 'float':
+            values = rng.random(rows) * 100
+            values[rng.random(rows) < 0.05] = np.nan
+        elif kind == 'str':
+            values = np.array(['alpha', 'bravo', 'charlie', 'delta', 'echo', 'foxtrot'], dtype=object)[
+                rng.integers(0, 6, rows)]
+        else:
+            values = pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 10 ** 8, rows), unit='s')
+        columns[f"c{i}"] = values
+    return pd.DataFrame(columns)
+
+
+def peak_rss_mb():
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes and macOS reports bytes
+        return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().peak_wset / 1024 ** 2
+    except (ImportError, AttributeError):
+        return None
+
+
+def summarize(times):
+    times = np.array(times) * 1000
+    return {'median': float(np.median(times)),
+            'p95': float(np.percentile(times, 95)),
+            'max': float(times.max())}
+
+
+def run_case(rows, cols, dtype, scroll_steps):
+    from PyQt5 import QtCore, QtWidgets
+    from pandasgui import show
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv)
+
+    df = generate_frame(rows, cols, dtype)
+    result = {'rows': rows, 'cols': cols, 'dtype': dtype, 'rss_before_show_mb': peak_rss_mb()}
+
+    # Time from calling show until the table has been painted once
+    painted = []
+
+    class PaintListener(QtCore.QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QtCore.QEvent.Paint:
+                painted.append(time.perf_counter())
+            return False
+
+    listener = PaintListener()
+    start = time.perf_counter()
+    gui = show(df, settings={'block': False})
+    pgdf = gui.store.data['df']
+    viewer = pgdf.dataframe_viewer
+    view = viewer.dataView
+    view.viewport().installEventFilter(listener)
+    while not painted and time.perf_counter() - start < 600:
+        app.processEvents()
+    result['first_paint'] = (painted[0] - start) * 1000 if painted else None
+    view.viewport().removeEventFilter(listener)
+
+    # Repaint the same viewport with warm caches
+    times = []
+    for _ in range(scroll_steps):
+        start = time.perf_counter()
+        viewer.repaint()
+        times.append(time.perf_counter() - start)
+    result['viewport_repaint'] = summarize(times)
+
+    # Scroll a page at a time and paint each frame, like dragging the scrollbar
+    for orientation, scrollbar in [('vertical', view.verticalScrollBar()), ('horizontal', view.horizontalScrollBar())]:
+        times = []
+        scrollbar.setValue(0)
+        app.processEvents()
+        for _ in range(scroll_steps):
+            start = time.perf_counter()
+            scrollbar.setValue(scrollbar.value() + scrollbar.pageStep())
+            app.processEvents()
+            viewer.repaint()
+            times.append(time.perf_counter() - start)
+            if scrollbar.value() == scrollbar.maximum():
+                scrollbar.setValue(0)
+        result[f'scroll_{orientation}'] = summarize(times)
+        scrollbar.setValue(0)
+
+    # Data changes until the new data is painted
+    column = df.columns[0]
+    if pd.api.types.is_numeric_dtype(df[column]):
+        expr = f"{column} > {df[column].median()}"
+    else:
+        expr = f"{column} > '{df[column].sort_values().iloc[len(df) // 2]}'"
+    # Subscribed last, so it's called after the views were updated with the change
+    flushed = []
+    pgdf.change_bus.subscribe(flushed.append)
+    for name, action in [('sort', lambda: pgdf.sort_column(0)),
+                         ('unsort', lambda: pgdf.sort_column(0, 'None')),
+                         ('filter', lambda: pgdf.add_filter(expr)),
+                         ('unfilter', lambda: pgdf.remove_filter(0))]:
+        flushed.clear()
+        start = time.perf_counter()
+        action()
+        app.processEvents()
+        # Filters are evaluated in the background, and their result is only applied to the views when the change it
+        # posts is flushed
+        while viewer.spinner.isSpinning() or pgdf.change_bus.pending is not None or not flushed:
+            app.processEvents()
+        viewer.repaint()
+        result[name] = (time.perf_counter() - start) * 1000
+
+    result['peak_rss_mb'] = peak_rss_mb()
+    gui.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--cols', type=int, nargs='+', default=[20])
+    parser.add_argument('--dtypes', nargs='+', choices=DTYPES, default=DTYPES)
+    parser.add_argument('--scroll-steps', type=int, default=50)
+    parser.add_argument('--output', default='benchmark_results.json')
+    # Used by the parent process to run a single case and print its result
+    parser.add_argument('--case', nargs=3, metavar=('ROWS', 'COLS', 'DTYPE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        rows, cols, dtype = args.case
+        print(json.dumps(run_case(int(rows), int(cols), dtype, args.scroll_steps)))
+        return
+
+    import pandasgui
+    from pandasgui.store import SETTINGS_STORE
+    from PyQt5.QtCore import QT_VERSION_STR
+
+    results = []
+    for rows in args.rows:
+        for cols in args.cols:
+            for dtype in args.dtypes:
+                print(f"Benchmarking {rows:,} x {cols:,} {dtype}...", flush=True)
+                process = subprocess.run([sys.executable, os.path.abspath(__file__),
+                                          '--case', str(rows), str(cols), dtype,
+                                          '--scroll-steps', str(args.scroll_steps)],
+                                         stdout=subprocess.PIPE, text=True)
+                if process.returncode != 0:
+                    results.append({'rows': rows, 'cols': cols, 'dtype': dtype, 'error': process.returncode})
+                    continue
+                # Only the last line is the result, anything before it was printed by the GUI
+                result = json.loads(process.stdout.strip().splitlines()[-1])
+                print(json.dumps(result))
+                results.append(result)
+
+    output = {
+        'created': datetime.now().isoformat(),
+        'versions': {'pandasgui': pandasgui.__version__, 'pandas': pd.__version__, 'numpy': np.__version__,
+                     'qt': QT_VERSION_STR, 'python': platform.python_version()},
+        'platform': platform.platform(),
+        'settings': {name: SETTINGS_STORE[name].value for name in ['refresh_statistics', 'progressive_rows']},
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f"Saved results to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
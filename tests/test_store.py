@@ -0,0 +1,129 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from pandasgui.store import DataChange, PandasGuiDataFrameStore, SettingsStore
+
+
+def make_store(**settings):
+    pgdf = PandasGuiDataFrameStore(pd.DataFrame({'a': [3, 1, 2, 1],
+                                                 'b': [1.5, np.nan, 0.5, 2.5],
+                                                 's': ['x', 'y', 'z', 'w']}))
+    if settings:
+        pgdf.settings = SettingsStore(**settings)
+    return pgdf
+
+
+def test_undo_redo_round_trip():
+    pgdf = make_store()
+    original = pgdf.df_unfiltered.copy()
+
+    pgdf.edit_data(0, 0, "10")
+    pgdf.paste_data(1, 1, pd.DataFrame({0: [7.5, 8.5]}))
+    pgdf.sort_column(0)
+    pgdf.delete_column(2)
+    edited = pgdf.df_unfiltered.copy()
+    edited_view = pgdf.df.copy()
+    sort = pgdf.get_sort()
+
+    for _ in range(4):
+        pgdf.undo()
+    pd.testing.assert_frame_equal(pgdf.df_unfiltered, original)
+    pd.testing.assert_frame_equal(pgdf.df, original)
+    assert pgdf.sort_state == 'None'
+    # Nothing left to undo
+    pgdf.undo()
+    pd.testing.assert_frame_equal(pgdf.df_unfiltered, original)
+
+    for _ in range(4):
+        pgdf.redo()
+    pd.testing.assert_frame_equal(pgdf.df_unfiltered, edited)
+    pd.testing.assert_frame_equal(pgdf.df, edited_view)
+    assert pgdf.get_sort() == sort
+
+
+def test_new_step_clears_redo():
+    pgdf = make_store()
+    pgdf.edit_data(0, 0, "10")
+    pgdf.undo()
+    pgdf.edit_data(1, 0, "20")
+    pgdf.redo()
+    assert pgdf.df_unfiltered['a'].tolist() == [3, 20, 2, 1]
+
+
+def test_undo_steps_spill_to_disk():
+    pgdf = make_store(undo_memory_mb=0)
+    for row, value in enumerate(["10", "20", "30"]):
+        pgdf.edit_data(row, 0, value)
+
+    steps = pgdf.undo_log.undo_steps
+    assert all(step.deltas is None and os.path.exists(step.path) for step in steps)
+
+    pgdf.undo()
+    pgdf.undo()
+    assert pgdf.df_unfiltered['a'].tolist() == [10, 1, 2, 1]
+    # Steps are loaded again when they're moved, and spilled again once they're not the one just applied
+    assert all(step.deltas is None for step in pgdf.undo_log.undo_steps)
+    assert pgdf.undo_log.redo_steps[-1].deltas is not None
+
+    pgdf.redo()
+    pgdf.redo()
+    assert pgdf.df_unfiltered['a'].tolist() == [10, 20, 30, 1]
+
+    spill_dir = pgdf.undo_log.spill_dir.name
+    pgdf.undo_log.clear()
+    assert not os.path.exists(spill_dir)
+
+
+def test_data_change_merge():
+    cells = DataChange('cells', rows=[3, 1], columns=[0]).merge(DataChange('cells', rows=[1, 2], columns=[2]))
+    assert (cells.kind, cells.rows, cells.columns) == ('cells', [1, 2, 3], [0, 2])
+
+    # Sorting and filtering don't move rows in df_unfiltered, so the changed rows are kept through them
+    merged = DataChange('cells', rows=[4], columns=[1]).merge(DataChange('sort')).merge(DataChange('filter'))
+    assert (merged.kind, merged.rows, merged.columns) == ('cells', [4], [1])
+    assert merged.kinds == {'cells', 'sort', 'filter'}
+
+    merged = DataChange('cells', rows=[4], columns=[1]).merge(DataChange('cells'))
+    assert merged.rows is None and merged.columns is None
+
+    assert DataChange('filter').merge(DataChange('sort')).kind == 'sort'
+    assert DataChange('sort').merge(DataChange('filter')).kinds == {'sort', 'filter'}
+
+    removed = DataChange('column_removed', columns=[2]).merge(DataChange('column_removed', columns=[0]))
+    assert (removed.kind, removed.columns) == ('column_removed', [2, 0])
+    moved = DataChange('columns_moved', movements=[(0, 2)]).merge(DataChange('columns_moved', movements=[(1, 0)]))
+    assert moved.movements == [(0, 2), (1, 0)]
+
+    # Positions from before columns were removed or moved are stale
+    assert DataChange('cells', rows=[1], columns=[3]).merge(DataChange('column_removed', columns=[0])).kind == 'reset'
+    assert DataChange('columns_moved', movements=[(0, 1)]).merge(DataChange('cells', rows=[1])).kind == 'reset'
+    assert DataChange('sort').merge(DataChange('reset')).kind == 'reset'
+
+
+def test_sort_by_several_columns():
+    df = pd.DataFrame({'a': [2, 1, 2, 1, 2], 'b': ['x', 'y', None, 'x', 'y'], 'c': [0.5, np.nan, 1.5, 2.5, 0.5]})
+    pgdf = PandasGuiDataFrameStore(df)
+
+    pgdf.sort_column(0)
+    pgdf.sort_column(1, append=True)
+    pd.testing.assert_frame_equal(pgdf.df, df.sort_values(['a', 'b'], kind='mergesort'))
+
+    # Appending an existing key flips it in place, then removes it
+    pgdf.sort_column(2, append=True)
+    pgdf.sort_column(1, append=True)
+    assert pgdf.get_sort()[-1] == (('b', 'Desc'), ('c', 'Asc'))
+    pd.testing.assert_frame_equal(pgdf.df, df.sort_values(['a', 'b', 'c'], ascending=[True, False, True],
+                                                          kind='mergesort'))
+    pgdf.sort_column(1, append=True)
+    pd.testing.assert_frame_equal(pgdf.df, df.sort_values(['a', 'c'], kind='mergesort'))
+
+    # The exported code reproduces the sort
+    namespace = {'df': df, 'pd': pd}
+    exec(pgdf.code_export(), namespace)
+    pd.testing.assert_frame_equal(namespace['df'], pgdf.df)
+
+    # Sorting without appending goes back to a single key
+    pgdf.sort_column(2)
+    assert pgdf.secondary_sort_columns == []
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+
+from pandasgui.utility import coerce_to_dtype, get_sort_key, reverse_sort_key, reverse_sort_order
+
+
+def test_coerce_text_to_bool():
+    values = pd.Series(['True', 'false', '0'], dtype=object)
+    coerced = coerce_to_dtype(values, np.dtype(bool))
+    assert coerced.dtype == np.dtype(bool)
+    assert coerced.tolist() == [True, False, False]
+
+    # A bool column can't hold missing values
+    values = pd.Series(['True', ''], dtype=object)
+    assert coerce_to_dtype(values, np.dtype(bool)).tolist() == ['True', '']
+
+    # Text that isn't a bool is left as it is rather than read as True
+    for text in ['False', 'no', 'q']:
+        values = pd.Series(['true', text], dtype=object)
+        coerced = coerce_to_dtype(values, np.dtype(bool))
+        assert coerced.tolist()[1] is not True
+
+
+def test_coerce_keeps_fractions_out_of_int():
+    for value in ['1.7', 1.7]:
+        values = pd.Series([value, 2], dtype=object)
+        coerced = coerce_to_dtype(values, np.dtype('int64'))
+        assert coerced.tolist() == [value, 2]
+
+    values = pd.Series(['1.0', 2, '3'], dtype=object)
+    coerced = coerce_to_dtype(values, np.dtype('int64'))
+    assert coerced.dtype == np.dtype('int64')
+    assert coerced.tolist() == [1, 2, 3]
+
+    values = pd.Series([1.7, 2.0])
+    assert coerce_to_dtype(values, np.dtype('int64')).tolist() == [1.7, 2.0]
+
+
+def test_reverse_sort_order_is_stable():
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        df = pd.DataFrame({'a': rng.integers(0, 4, 50).astype(float), 'b': rng.integers(0, 3, 50)})
+        df.loc[rng.random(50) < 0.2, 'a'] = np.nan
+        values = df['a'].to_numpy()
+        # Stable ascending order with missing values last, like PandasGuiDataFrameStore keeps
+        order = np.argsort(values, kind='stable')
+        valid = int(df['a'].notna().sum())
+
+        descending = reverse_sort_order(order, [values[order]], valid)
+        expected = df.sort_values('a', ascending=False, kind='mergesort').index.to_numpy()
+        np.testing.assert_array_equal(descending, expected)
+
+        # Runs are only broken where any of the sorted arrays change
+        df['a'] = df['a'].fillna(-1)
+        order = df.sort_values(['a', 'b'], kind='mergesort').index.to_numpy()
+        arrays = [df['a'].to_numpy()[order], df['b'].to_numpy()[order]]
+        descending = reverse_sort_order(order, arrays, len(df))
+        expected = df.sort_values(['a', 'b'], ascending=False, kind='mergesort').index.to_numpy()
+        np.testing.assert_array_equal(descending, expected)
+
+
+def test_reverse_sort_order_short():
+    np.testing.assert_array_equal(reverse_sort_order(np.array([1, 0]), [np.array([5.0, np.nan])], 1), [1, 0])
+    np.testing.assert_array_equal(reverse_sort_order(np.array([], dtype=int), [np.array([])], 0), [])
+
+
+def make_sort_frame(rows=60, seed=0):
+    rng = np.random.default_rng(seed)
+    floats = rng.integers(0, 4, rows).astype(float)
+    floats[rng.random(rows) < 0.2] = np.nan
+    strings = np.array(['b', 'a', 'c', None], dtype=object)[rng.integers(0, 4, rows)]
+    dates = pd.Series(pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 3, rows), unit='D'))
+    dates[rng.random(rows) < 0.2] = pd.NaT
+    return pd.DataFrame({
+        'int': rng.integers(0, 3, rows),
+        'float': floats,
+        'str': strings,
+        'cat': pd.Categorical(strings, categories=['c', 'a', 'b']),
+        'date': dates,
+        'bool': rng.random(rows) > 0.5,
+    })
+
+
+def test_lexsort_of_sort_keys_matches_sort_values():
+    df = make_sort_frame()
+    for first in df.columns:
+        for second in df.columns:
+            if first == second:
+                continue
+            for ascending in [(True, True), (True, False), (False, True), (False, False)]:
+                keys = []
+                for name, asc in zip([first, second], ascending):
+                    key, missing = get_sort_key(df[name])
+                    keys.append(key if asc else reverse_sort_key(key, missing))
+                # lexsort sorts by the last key first
+                order = np.lexsort(keys[::-1])
+                expected = df.sort_values([first, second], ascending=list(ascending), kind='mergesort').index
+                np.testing.assert_array_equal(order, expected.to_numpy(), err_msg=f"{first}, {second}, {ascending}")